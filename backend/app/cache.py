@@ -0,0 +1,64 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.config import settings
+
+# Shared Redis connection pool (caching is disabled when REDIS_URL is not set)
+redis_client: Optional[aioredis.Redis] = (
+    aioredis.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        decode_responses=True,
+    )
+    if settings.REDIS_URL
+    else None
+)
+
+
+async def cache_get_many(*keys: str) -> List[Optional[Any]]:
+    """Get cached JSON values, with None for misses or when Redis is unavailable."""
+    if redis_client is None:
+        return [None] * len(keys)
+
+    try:
+        values = await redis_client.mget(keys)
+    except RedisError:
+        return [None] * len(keys)
+
+    return [None if value is None else json.loads(value) for value in values]
+
+
+async def cache_set_many(values: Dict[str, Any], expire: int) -> None:
+    """Cache JSON-serializable values with a TTL in seconds."""
+    if redis_client is None:
+        return
+
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(key, json.dumps(value), ex=expire)
+            await pipe.execute()
+    except RedisError:
+        pass
+
+
+async def cache_delete(*keys: str) -> None:
+    """Invalidate cached keys."""
+    if redis_client is None:
+        return
+
+    try:
+        await redis_client.delete(*keys)
+    except RedisError:
+        pass
+
+
+async def close_cache() -> None:
+    """Release the Redis connection pool."""
+    if redis_client is not None:
+        await redis_client.aclose()
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -6,11 +6,21 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 10
+    DB_POOL_RECYCLE: int = 1800
+
+    # Redis cache (optional - caching is disabled when unset)
+    REDIS_URL: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 20
+    REDIS_SOCKET_TIMEOUT: float = 0.3  # seconds; a slow or unreachable Redis falls back to the database
 
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    BCRYPT_ROUNDS: int = 12
 
     # CORS
     CORS_ORIGINS: str = "http://localhost:5173"
@@ -22,6 +32,8 @@ class Settings(BaseSettings):
 
     # Static Files URL (for image uploads)
     STATIC_URL: str = "http://localhost"
+    # Serve /static/uploads from the app - turn off when nginx serves the uploads volume
+    SERVE_STATIC: bool = True
 
     @property
     def cors_origins_list(self) -> List[str]:
@@ -2,14 +2,18 @@ from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
+from app.models.user import User
 from app.utils.auth import decode_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Runs on every authenticated request - built once at import
+SELECT_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
 
 async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     """Get the current authenticated user from JWT token."""
@@ -27,10 +31,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     if user_id is None:
         raise credentials_exception
 
-    # Import here to avoid circular imports
-    from app.models.user import User
-
-    result = await db.execute(select(User).where(User.id == int(user_id)))
+    result = await db.execute(SELECT_USER_BY_ID, {"user_id": int(user_id)})
     user = result.scalar_one_or_none()
 
     if user is None:
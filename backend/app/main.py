@@ -1,12 +1,23 @@
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
+from app.cache import close_cache
 from app.config import settings
 from app.routers import auth, comments, likes, posts, upload
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release shared resources on shutdown."""
+    yield
+    await close_cache()
+
+
 app = FastAPI(
     title="Blog App API",
     description="FastAPI backend for Blog Application",
@@ -14,6 +25,9 @@ app = FastAPI(
     docs_url=f"{settings.API_PREFIX}/docs",
     redoc_url=f"{settings.API_PREFIX}/redoc",
     openapi_url=f"{settings.API_PREFIX}/openapi.json",
+    lifespan=lifespan,
+    # orjson serializes response bodies straight to bytes, several times faster than the stdlib json module
+    default_response_class=ORJSONResponse,
 )
 
 app.include_router(auth.router, prefix=f"{settings.API_PREFIX}/auth", tags=["Authentication"])
@@ -31,10 +45,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files
-if not os.path.exists("uploads"):
-    os.makedirs("uploads")
-app.mount("/static/uploads", StaticFiles(directory="uploads"), name="static")
+# Mount static files (production nginx serves the uploads volume directly)
+if settings.SERVE_STATIC:
+    if not os.path.exists("uploads"):
+        os.makedirs("uploads")
+    app.mount("/static/uploads", StaticFiles(directory="uploads"), name="static")
 
 
 @app.get("/")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -20,8 +20,14 @@ class Comment(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
-    post = relationship("Post", backref="comments")
-    author = relationship("User", backref="comments")
+    post = relationship("Post", back_populates="comments")
+    author = relationship("User", back_populates="comments", lazy="joined")
+
+    # A post's comments are listed newest first - serve them from the index already in order
+    __table_args__ = (Index("ix_comments_post_created", post_id, created_at.desc()),)
+
+    # Fetch server-generated timestamps during the flush so responses need no refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     def __repr__(self):
         return f"<Comment(id={self.id}, post_id={self.post_id}, author_id={self.author_id})>"
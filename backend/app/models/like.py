@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -18,11 +18,14 @@ class Like(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    post = relationship("Post", backref="likes")
-    user = relationship("User", backref="likes")
+    post = relationship("Post", back_populates="likes")
+    user = relationship("User", back_populates="likes")
 
-    # Ensure one user can only like a post once
-    __table_args__ = (UniqueConstraint("post_id", "user_id", name="unique_post_user_like"),)
+    # Ensure one user can only like a post once; the reverse index serves per-user lookups
+    __table_args__ = (
+        UniqueConstraint("post_id", "user_id", name="unique_post_user_like"),
+        Index("ix_likes_user_post", "user_id", "post_id"),
+    )
 
     def __repr__(self):
         return f"<Like(id={self.id}, post_id={self.post_id}, user_id={self.user_id})>"
@@ -41,11 +44,14 @@ class Bookmark(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    post = relationship("Post", backref="bookmarks")
-    user = relationship("User", backref="bookmarks")
-
-    # Ensure one user can only bookmark a post once
-    __table_args__ = (UniqueConstraint("post_id", "user_id", name="unique_post_user_bookmark"),)
+    post = relationship("Post", back_populates="bookmarks")
+    user = relationship("User", back_populates="bookmarks")
+
+    # Ensure one user can only bookmark a post once; the reverse index serves per-user lookups
+    __table_args__ = (
+        UniqueConstraint("post_id", "user_id", name="unique_post_user_bookmark"),
+        Index("ix_bookmarks_user_post", "user_id", "post_id"),
+    )
 
     def __repr__(self):
         return f"<Bookmark(id={self.id}, post_id={self.post_id}, user_id={self.user_id})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text, Update, update
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -19,6 +19,10 @@ class Post(Base):
     seo_title = Column(String(255), nullable=True)
     seo_description = Column(Text, nullable=True)
 
+    # Running counters kept in step by the like and comment handlers
+    likes_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Foreign key
     author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
@@ -26,8 +30,27 @@ class Post(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    # Relationships
-    author = relationship("User", backref="posts")
+    # Relationships (collections must be loaded explicitly; rows are removed by ON DELETE CASCADE)
+    author = relationship("User", back_populates="posts", lazy="joined")
+    comments = relationship("Comment", back_populates="post", lazy="raise", passive_deletes=True)
+    likes = relationship("Like", back_populates="post", lazy="raise", passive_deletes=True)
+    bookmarks = relationship("Bookmark", back_populates="post", lazy="raise", passive_deletes=True)
+    tags = relationship("Tag", secondary="post_tags", lazy="raise", passive_deletes=True)
+
+    # The feed filters on is_draft and pages by (published_at, id) newest first;
+    # "my posts" lists an author's posts newest first
+    __table_args__ = (
+        Index("ix_posts_draft_published", is_draft, published_at.desc(), id.desc()),
+        Index("ix_posts_author_created", author_id, created_at.desc()),
+    )
+
+    # Fetch server-generated timestamps during the flush so responses need no refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     def __repr__(self):
         return f"<Post(id={self.id}, title={self.title}, author_id={self.author_id})>"
+
+
+def update_post_counters(**counters) -> Update:
+    """UPDATE posts' like/comment counters, keeping updated_at - a like or comment is not an edit of the post."""
+    return update(Post).values(**counters, updated_at=Post.updated_at).execution_options(synchronize_session=False)
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
@@ -22,5 +23,11 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # Relationships (collections must be loaded explicitly; rows are removed by ON DELETE CASCADE)
+    posts = relationship("Post", back_populates="author", lazy="raise", passive_deletes=True)
+    comments = relationship("Comment", back_populates="author", lazy="raise", passive_deletes=True)
+    likes = relationship("Like", back_populates="user", lazy="raise", passive_deletes=True)
+    bookmarks = relationship("Bookmark", back_populates="user", lazy="raise", passive_deletes=True)
+
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, name={self.name})>"
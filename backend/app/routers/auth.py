@@ -1,38 +1,45 @@
-import random
+import secrets
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import select
+from sqlalchemy import bindparam, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.dependencies import get_current_active_user
 from app.models.user import User
 from app.schemas.user import OTPVerify, PasswordChange, Token, UserCreate, UserLogin, UserResponse, UserUpdate
-from app.utils.auth import create_access_token, get_password_hash, verify_password
+from app.utils.auth import create_access_token, get_password_hash, verify_and_hash_password, verify_password
 
 router = APIRouter()
 
+# Built once at import; requests only bind the email
+SELECT_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
+# Checked against on logins for unknown emails so every attempt costs one bcrypt verify
+DUMMY_PASSWORD_HASH = get_password_hash("dummy-password")
+
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user and send OTP for verification."""
     # Check if user already exists
-    result = await db.execute(select(User).where(User.email == user_data.email))
+    result = await db.execute(SELECT_USER_BY_EMAIL, {"email": user_data.email})
     existing_user = result.scalar_one_or_none()
 
     if existing_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
     # Generate OTP (6-digit code)
-    otp_code = str(random.randint(100000, 999999))
+    otp_code = f"{secrets.randbelow(900000) + 100000:06d}"
 
     # Create new user
     new_user = User(
         name=user_data.name,
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await run_in_threadpool(get_password_hash, user_data.password),
         otp_code=otp_code,
         otp_created_at=datetime.utcnow(),
         is_verified=0,
@@ -55,46 +62,59 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
 @router.post("/verify")
 async def verify_otp(verify_data: OTPVerify, db: AsyncSession = Depends(get_db)):
     """Verify OTP and activate user account."""
-    result = await db.execute(select(User).where(User.email == verify_data.email))
+    # OTP expires after 10 minutes
+    otp_cutoff = datetime.utcnow() - timedelta(minutes=10)
+
+    # Mark user as verified only if every check passes - one UPDATE covers the whole success path
+    result = await db.execute(
+        update(User)
+        .where(
+            User.email == verify_data.email,
+            User.is_verified == 0,
+            User.otp_code == verify_data.otp_code,
+            or_(User.otp_created_at.is_(None), User.otp_created_at >= otp_cutoff),
+        )
+        .values(is_verified=1, otp_code=None, otp_created_at=None)
+    )
+    verified = result.rowcount == 1
+
+    result = await db.execute(SELECT_USER_BY_EMAIL, {"email": verify_data.email})
     user = result.scalar_one_or_none()
 
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    # Nothing updated - work out which check failed
+    if not verified:
+        if not user:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    if user.is_verified == 1:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already verified")
+        if user.is_verified == 1:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already verified")
 
-    # Check OTP expiration (10 minutes)
-    if user.otp_created_at:
-        otp_age = datetime.utcnow() - user.otp_created_at
-        if otp_age > timedelta(minutes=10):
+        if user.otp_created_at and user.otp_created_at < otp_cutoff:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="OTP expired. Please request a new one.")
 
-    # Verify OTP
-    if user.otp_code != verify_data.otp_code:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid OTP code")
 
-    # Mark user as verified
-    user.is_verified = 1
-    user.otp_code = None
-    user.otp_created_at = None
     await db.commit()
-    await db.refresh(user)
 
     # Create access token
     access_token = create_access_token(data={"sub": str(user.id)})
 
-    return {"access_token": access_token, "token_type": "bearer", "user": UserResponse.from_orm(user)}
+    return {"access_token": access_token, "token_type": "bearer", "user": UserResponse.model_validate(user)}
 
 
 @router.post("/login", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     """Login user and return JWT token."""
     # Find user by email (username field contains email)
-    result = await db.execute(select(User).where(User.email == form_data.username))
+    result = await db.execute(SELECT_USER_BY_EMAIL, {"email": form_data.username})
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Always run one bcrypt verify so response time does not reveal whether the email exists
+    # (bcrypt is CPU-bound - keep it off the event loop)
+    hashed_password = user.hashed_password if user else DUMMY_PASSWORD_HASH
+    password_valid = await run_in_threadpool(verify_password, form_data.password, hashed_password)
+
+    if not user or not password_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -123,7 +143,7 @@ async def update_profile(
     """Update user profile."""
     # Check if email is being changed and if it's already taken
     if user_update.email and user_update.email != current_user.email:
-        result = await db.execute(select(User).where(User.email == user_update.email))
+        result = await db.execute(SELECT_USER_BY_EMAIL, {"email": user_update.email})
         existing_user = result.scalar_one_or_none()
         if existing_user:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already in use")
@@ -148,16 +168,22 @@ async def change_password(
     password_data: PasswordChange, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)
 ):
     """Change user password."""
-    # Verify current password
-    if not verify_password(password_data.current_password, current_user.hashed_password):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Current password is incorrect")
-
-    # Verify new password matches confirmation
+    # Verify new password matches confirmation (cheap - before any bcrypt work)
     if password_data.new_password != password_data.confirm_password:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="New passwords do not match")
 
+    # Verify current password and hash the new one in a single threadpool hop
+    hashed_password = await run_in_threadpool(
+        verify_and_hash_password,
+        password_data.current_password,
+        current_user.hashed_password,
+        password_data.new_password,
+    )
+    if hashed_password is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Current password is incorrect")
+
     # Update password
-    current_user.hashed_password = get_password_hash(password_data.new_password)
+    current_user.hashed_password = hashed_password
     await db.commit()
 
     return {"message": "Password changed successfully"}
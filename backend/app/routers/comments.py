@@ -1,65 +1,69 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import bindparam, exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, load_only, raiseload
 
 from app.database import get_db
 from app.dependencies import get_current_active_user
 from app.models.comment import Comment
-from app.models.post import Post
+from app.models.post import Post, update_post_counters
 from app.models.user import User
 from app.schemas.comment import CommentCreate, CommentResponse
 
 router = APIRouter()
 
+# Built once at import; requests only bind post_id
+SELECT_POST_COMMENTS = (
+    select(Comment)
+    .options(
+        # Only the columns CommentResponse serializes (never password or OTP fields)
+        load_only(Comment.id, Comment.content, Comment.post_id, Comment.author_id, Comment.created_at),
+        joinedload(Comment.author).load_only(User.id, User.name, User.avatar),
+        raiseload("*"),
+    )
+    .where(Comment.post_id == bindparam("post_id"))
+    .order_by(Comment.created_at.desc())
+)
+SELECT_POST_EXISTS = select(exists().where(Post.id == bindparam("post_id")))
+# The post row keeps a running comments count, adjusted in the same transaction as the comment itself
+ADJUST_COMMENTS_COUNT = update_post_counters(comments_count=Post.comments_count + bindparam("delta")).where(
+    Post.id == bindparam("post_id")
+)
+
 
 @router.post("", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
 async def create_comment(
     comment_data: CommentCreate, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)
 ):
     """Add a comment to a post (authenticated users only)."""
-    # Check if post exists
-    result = await db.execute(select(Post).where(Post.id == comment_data.post_id))
-    post = result.scalar_one_or_none()
+    # Count the comment on its post - no row updated means the post does not exist
+    result = await db.execute(ADJUST_COMMENTS_COUNT, {"post_id": comment_data.post_id, "delta": 1})
 
-    if not post:
+    if result.rowcount == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
 
-    # Create comment
-    new_comment = Comment(content=comment_data.content, post_id=comment_data.post_id, author_id=current_user.id)
+    # Create comment - the author is the current user, so nothing needs loading back
+    new_comment = Comment(content=comment_data.content, post_id=comment_data.post_id, author=current_user)
 
     db.add(new_comment)
     await db.commit()
-    await db.refresh(new_comment)
-
-    # Load author relationship
-    result = await db.execute(select(Comment).options(selectinload(Comment.author)).where(Comment.id == new_comment.id))
-    comment = result.scalar_one()
 
-    return comment
+    return new_comment
 
 
 @router.get("/post/{post_id}", response_model=List[CommentResponse])
 async def get_post_comments(post_id: int, db: AsyncSession = Depends(get_db)):
     """Get all comments for a specific post."""
-    # Check if post exists
-    result = await db.execute(select(Post).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
-
-    if not post:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
-
     # Get comments
-    result = await db.execute(
-        select(Comment)
-        .options(selectinload(Comment.author))
-        .where(Comment.post_id == post_id)
-        .order_by(Comment.created_at.desc())
-    )
+    result = await db.execute(SELECT_POST_COMMENTS, {"post_id": post_id})
     comments = result.scalars().all()
 
+    # Comments imply the post exists - only an empty result needs the existence check
+    if not comments and not await db.scalar(SELECT_POST_EXISTS, {"post_id": post_id}):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+
     return comments
 
 
@@ -68,8 +72,7 @@ async def delete_comment(
     comment_id: int, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)
 ):
     """Delete a comment (owner only)."""
-    result = await db.execute(select(Comment).where(Comment.id == comment_id))
-    comment = result.scalar_one_or_none()
+    comment = await db.get(Comment, comment_id)
 
     if not comment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
@@ -79,6 +82,7 @@ async def delete_comment(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this comment")
 
     await db.delete(comment)
+    await db.execute(ADJUST_COMMENTS_COUNT, {"post_id": comment.post_id, "delta": -1})
     await db.commit()
 
     return None
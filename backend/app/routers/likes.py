@@ -1,18 +1,77 @@
+import hashlib
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import and_, func, select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import and_, bindparam, delete, exists, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import cache_delete, cache_get_many, cache_set_many
 from app.database import get_db
 from app.dependencies import get_current_active_user
 from app.models.like import Bookmark, Like
-from app.models.post import Post
+from app.models.post import Post, update_post_counters
 from app.models.user import User
 from app.schemas.like import BookmarkResponse, BookmarkStatus, LikeResponse, LikeStatus
+from app.utils.http import etag_matches
 
 router = APIRouter()
 
+# Like/bookmark status is read on every feed render; keep it briefly in Redis per user. A user's own
+# toggle clears it, so only other users' likes can lag behind in the count, by at most this long
+STATUS_CACHE_TTL = 10  # seconds
+# Browsers may reuse a status response this long before revalidating with its ETag
+STATUS_MAX_AGE = 5  # seconds
+
+# MySQL error codes an insert of a like/bookmark can fail with
+MYSQL_DUP_ENTRY = 1062
+MYSQL_NO_REFERENCED_ROW = 1452
+
+# Hot statements are built once at import; requests only bind post_id/user_id and
+# SQLAlchemy's compiled cache serves the SQL string
+POST_EXISTS = exists().where(Post.id == bindparam("post_id"))
+LIKE_MATCH = and_(Like.post_id == bindparam("post_id"), Like.user_id == bindparam("user_id"))
+LIKES_COUNT = select(Post.likes_count).where(Post.id == bindparam("post_id"))
+BOOKMARK_MATCH = and_(Bookmark.post_id == bindparam("post_id"), Bookmark.user_id == bindparam("user_id"))
+
+DELETE_LIKE = delete(Like).where(LIKE_MATCH).execution_options(synchronize_session=False)
+INSERT_LIKE = insert(Like)
+# The post row keeps a running likes count, adjusted in the same transaction as the like itself
+ADJUST_LIKES_COUNT = update_post_counters(likes_count=Post.likes_count + bindparam("delta")).where(
+    Post.id == bindparam("post_id")
+)
+SELECT_LIKE_STATUS = select(POST_EXISTS, exists().where(LIKE_MATCH), LIKES_COUNT.scalar_subquery())
+SELECT_POST_LIKES = select(POST_EXISTS, LIKES_COUNT.scalar_subquery())
+
+DELETE_BOOKMARK = delete(Bookmark).where(BOOKMARK_MATCH).execution_options(synchronize_session=False)
+INSERT_BOOKMARK = insert(Bookmark)
+SELECT_BOOKMARK_STATUS = select(POST_EXISTS, exists().where(BOOKMARK_MATCH))
+SELECT_POST_EXISTS = select(POST_EXISTS)
+
+
+def is_duplicate_key(error: IntegrityError) -> bool:
+    """Check whether an insert hit a unique constraint (MySQL ER_DUP_ENTRY, or SQLite)."""
+    return error.orig.args[:1] == (MYSQL_DUP_ENTRY,) or "UNIQUE constraint failed" in str(error.orig)
+
+
+def raise_missing_post(error: IntegrityError) -> None:
+    """Turn a post_id foreign key violation (MySQL ER_NO_REFERENCED_ROW_2, or SQLite) into a 404; re-raise anything else."""
+    if error.orig.args[:1] == (MYSQL_NO_REFERENCED_ROW,) or "FOREIGN KEY constraint failed" in str(error.orig):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found") from error
+    raise error
+
+
+def not_modified(request: Request, response: Response, *state) -> Optional[Response]:
+    """Tag a status response with an ETag of its state; return a 304 if the client's copy is current."""
+    etag = '"' + hashlib.blake2b(":".join(map(str, state)).encode(), digest_size=8).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={STATUS_MAX_AGE}"}
+
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
 
 # ===== LIKES =====
 
@@ -20,77 +79,92 @@ router = APIRouter()
 @router.post("/posts/{post_id}/like", response_model=LikeStatus)
 async def like_post(post_id: int, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
     """Like a post (toggle - if already liked, unlike it)."""
-    # Check if post exists
-    result = await db.execute(select(Post).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
+    params = {"post_id": post_id, "user_id": current_user.id}
 
-    if not post:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+    # Unlike - if a like was removed the post exists and we are done
+    result = await db.execute(DELETE_LIKE, params)
+    is_liked = result.rowcount == 0
 
-    # Check if already liked
-    result = await db.execute(select(Like).where(and_(Like.post_id == post_id, Like.user_id == current_user.id)))
-    existing_like = result.scalar_one_or_none()
+    # Count the like before inserting it, as create_comment does: the UPDATE takes the post row's exclusive
+    # lock first, so concurrent likes queue on it rather than deadlock with the foreign key check's shared lock
+    result = await db.execute(ADJUST_LIKES_COUNT, {"post_id": post_id, "delta": 1 if is_liked else -1})
 
-    if existing_like:
-        # Unlike - remove the like
-        await db.delete(existing_like)
-        await db.commit()
-        is_liked = False
-    else:
-        # Like - add new like
-        new_like = Like(post_id=post_id, user_id=current_user.id)
-        db.add(new_like)
-        await db.commit()
-        is_liked = True
+    if is_liked:
+        # No row updated means the post does not exist
+        if result.rowcount == 0:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+
+        try:
+            await db.execute(INSERT_LIKE, params)
+        except IntegrityError as error:
+            # Undoes the count as well
+            await db.rollback()
+            if not is_duplicate_key(error):
+                raise
+            # A racing request (e.g. a double-click) already liked the post and adjusted the count
+            return LikeStatus(is_liked=True, likes_count=await db.scalar(LIKES_COUNT, {"post_id": post_id}))
 
-    # Get total likes count
-    likes_count = await db.scalar(select(func.count(Like.id)).where(Like.post_id == post_id))
+    # The count lives on the post row - read it back by primary key
+    likes_count = await db.scalar(LIKES_COUNT, {"post_id": post_id})
+    await db.commit()
+    await cache_delete(f"like:{post_id}:{current_user.id}")
 
-    return LikeStatus(is_liked=is_liked, likes_count=likes_count or 0)
+    return LikeStatus(is_liked=is_liked, likes_count=likes_count)
 
 
+# HEAD revalidates the ETag without a body; kept out of the schema so operation IDs stay unique
 @router.get("/posts/{post_id}/like-status", response_model=LikeStatus)
+@router.head("/posts/{post_id}/like-status", response_model=LikeStatus, include_in_schema=False)
 async def get_like_status(
-    post_id: int, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)
+    post_id: int,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Check if current user has liked a post and get total likes count."""
-    # Check if post exists
-    result = await db.execute(select(Post).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
+    like_key = f"like:{post_id}:{current_user.id}"
+    (cached,) = await cache_get_many(like_key)
+    if cached is not None:
+        like_status = LikeStatus(**cached)
+    else:
+        # Post existence, user's like and total likes in a single query
+        result = await db.execute(SELECT_LIKE_STATUS, {"post_id": post_id, "user_id": current_user.id})
+        post_exists, is_liked, likes_count = result.one()
 
-    if not post:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+        if not post_exists:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
 
-    # Check if user has liked
-    result = await db.execute(select(Like).where(and_(Like.post_id == post_id, Like.user_id == current_user.id)))
-    user_like = result.scalar_one_or_none()
+        like_status = LikeStatus(is_liked=bool(is_liked), likes_count=likes_count or 0)
+        await cache_set_many({like_key: like_status.model_dump()}, expire=STATUS_CACHE_TTL)
 
-    # Get total likes count
-    likes_count = await db.scalar(select(func.count(Like.id)).where(Like.post_id == post_id))
+    # Client already has this state - skip the body
+    cached_response = not_modified(request, response, post_id, like_status.likes_count, int(like_status.is_liked))
+    if cached_response is not None:
+        return cached_response
 
-    return LikeStatus(is_liked=user_like is not None, likes_count=likes_count or 0)
+    return like_status
 
 
 @router.delete("/posts/{post_id}/like", response_model=LikeStatus)
 async def unlike_post(post_id: int, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
     """Unlike a post."""
-    # Check if post exists
-    result = await db.execute(select(Post).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
-
-    if not post:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
-
     # Find and delete like
-    result = await db.execute(select(Like).where(and_(Like.post_id == post_id, Like.user_id == current_user.id)))
-    like = result.scalar_one_or_none()
+    result = await db.execute(DELETE_LIKE, {"post_id": post_id, "user_id": current_user.id})
+    if result.rowcount:
+        await db.execute(ADJUST_LIKES_COUNT, {"post_id": post_id, "delta": -1})
 
-    if like:
-        await db.delete(like)
-        await db.commit()
+    # Post existence and total likes count in a single query
+    result = await db.execute(SELECT_POST_LIKES, {"post_id": post_id})
+    post_exists, likes_count = result.one()
 
-    # Get total likes count
-    likes_count = await db.scalar(select(func.count(Like.id)).where(Like.post_id == post_id))
+    if not post_exists:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+
+    await db.commit()
+    await cache_delete(f"like:{post_id}:{current_user.id}")
 
     return LikeStatus(is_liked=False, likes_count=likes_count or 0)
 
@@ -103,49 +177,59 @@ async def bookmark_post(
     post_id: int, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)
 ):
     """Bookmark a post (toggle - if already bookmarked, remove it)."""
-    # Check if post exists
-    result = await db.execute(select(Post).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
-
-    if not post:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
-
-    # Check if already bookmarked
-    result = await db.execute(select(Bookmark).where(and_(Bookmark.post_id == post_id, Bookmark.user_id == current_user.id)))
-    existing_bookmark = result.scalar_one_or_none()
-
-    if existing_bookmark:
-        # Remove bookmark
-        await db.delete(existing_bookmark)
-        await db.commit()
-        is_bookmarked = False
-    else:
-        # Add bookmark
-        new_bookmark = Bookmark(post_id=post_id, user_id=current_user.id)
-        db.add(new_bookmark)
-        await db.commit()
-        is_bookmarked = True
+    params = {"post_id": post_id, "user_id": current_user.id}
+
+    # Remove bookmark - if one was removed the post exists and we are done
+    result = await db.execute(DELETE_BOOKMARK, params)
+    is_bookmarked = result.rowcount == 0
+
+    if is_bookmarked:
+        # Add bookmark - the post_id foreign key doubles as the existence check
+        try:
+            await db.execute(INSERT_BOOKMARK, params)
+        except IntegrityError as error:
+            await db.rollback()
+            if not is_duplicate_key(error):
+                raise_missing_post(error)
+            # A racing request (e.g. a double-click) already bookmarked the post and clears the cached status
+            return BookmarkStatus(is_bookmarked=True)
+
+    await db.commit()
+    await cache_delete(f"bookmark:{post_id}:{current_user.id}")
 
     return BookmarkStatus(is_bookmarked=is_bookmarked)
 
 
+# HEAD revalidates the ETag without a body; kept out of the schema so operation IDs stay unique
 @router.get("/posts/{post_id}/bookmark-status", response_model=BookmarkStatus)
+@router.head("/posts/{post_id}/bookmark-status", response_model=BookmarkStatus, include_in_schema=False)
 async def get_bookmark_status(
-    post_id: int, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)
+    post_id: int,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Check if current user has bookmarked a post."""
-    # Check if post exists
-    result = await db.execute(select(Post).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
+    bookmark_key = f"bookmark:{post_id}:{current_user.id}"
+    (is_bookmarked,) = await cache_get_many(bookmark_key)
+    if is_bookmarked is None:
+        # Post existence and user's bookmark in a single query
+        result = await db.execute(SELECT_BOOKMARK_STATUS, {"post_id": post_id, "user_id": current_user.id})
+        post_exists, is_bookmarked = result.one()
 
-    if not post:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+        if not post_exists:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
 
-    # Check if user has bookmarked
-    result = await db.execute(select(Bookmark).where(and_(Bookmark.post_id == post_id, Bookmark.user_id == current_user.id)))
-    user_bookmark = result.scalar_one_or_none()
+        is_bookmarked = bool(is_bookmarked)
+        await cache_set_many({bookmark_key: is_bookmarked}, expire=STATUS_CACHE_TTL)
 
-    return BookmarkStatus(is_bookmarked=user_bookmark is not None)
+    # Client already has this state - skip the body
+    cached_response = not_modified(request, response, post_id, int(is_bookmarked))
+    if cached_response is not None:
+        return cached_response
+
+    return BookmarkStatus(is_bookmarked=is_bookmarked)
 
 
 @router.delete("/posts/{post_id}/bookmark", response_model=BookmarkStatus)
@@ -153,19 +237,15 @@ async def remove_bookmark(
     post_id: int, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)
 ):
     """Remove bookmark from a post."""
-    # Check if post exists
-    result = await db.execute(select(Post).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
+    # Find and delete bookmark
+    result = await db.execute(DELETE_BOOKMARK, {"post_id": post_id, "user_id": current_user.id})
 
-    if not post:
+    # Nothing removed - only then is it worth checking whether the post exists
+    if result.rowcount == 0 and not await db.scalar(SELECT_POST_EXISTS, {"post_id": post_id}):
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
 
-    # Find and delete bookmark
-    result = await db.execute(select(Bookmark).where(and_(Bookmark.post_id == post_id, Bookmark.user_id == current_user.id)))
-    bookmark = result.scalar_one_or_none()
-
-    if bookmark:
-        await db.delete(bookmark)
-        await db.commit()
+    await db.commit()
+    await cache_delete(f"bookmark:{post_id}:{current_user.id}")
 
     return BookmarkStatus(is_bookmarked=False)
@@ -1,28 +1,54 @@
+import base64
+import binascii
+import logging
 import re
+import unicodedata
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, func, or_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import Row, Select, and_, bindparam, func, insert, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.database import get_db
 from app.dependencies import get_current_active_user
-from app.models.comment import Comment
-from app.models.like import Like
 from app.models.post import Post
 from app.models.tag import Tag, post_tags
 from app.models.user import User
-from app.schemas.post import AuthorInfo, PostCreate, PostListResponse, PostResponse, PostUpdate
+from app.schemas.post import PostCreate, PostListResponse, PostResponse, PostUpdate
+from app.utils.http import cached_json_response
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Browsers and proxies may reuse a feed page briefly; a single post is always revalidated
+# with its ETag, so an author sees their edit straight away
+FEED_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=120"
+POST_CACHE_CONTROL = "public, no-cache"
+
+# HTML tags are stripped from content to count words for the read time
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+# Tags another request created in the meantime are skipped rather than failing the insert
+INSERT_TAGS = insert(Tag).prefix_with("IGNORE", dialect="mysql").prefix_with("OR IGNORE", dialect="sqlite")
+
+# Posts (like/comment counts live on the row) with their author and tags
+# Any other relationship access raises instead of quietly issuing a query per post
+SELECT_POSTS = select(Post).options(joinedload(Post.author), selectinload(Post.tags), raiseload("*"))
+# Offset pages also carry the total number of matching posts, computed before LIMIT/OFFSET
+SELECT_POSTS_PAGE = SELECT_POSTS.add_columns(func.count().over())
+# Unlink only the tags a post edit dropped
+DELETE_POST_TAGS = post_tags.delete().where(
+    post_tags.c.post_id == bindparam("post_id"), post_tags.c.tag_id.in_(bindparam("tag_ids", expanding=True))
+)
 
 
 def calculate_read_time(content: str) -> int:
     """Calculate estimated read time in minutes based on word count."""
     # Strip HTML tags
-    text = re.sub(r"<[^>]+>", "", content)
+    text = HTML_TAG_RE.sub("", content)
     words = len(text.split())
     # Average reading speed: 200 words per minute
     return max(1, words // 200)
@@ -33,31 +59,102 @@ def generate_excerpt(content: str, seo_description: Optional[str] = None) -> str
     if seo_description:
         return seo_description
 
-    # Strip HTML tags
-    text = re.sub(r"<[^>]+>", "", content)
+    # Strip HTML tags from just enough of the content to know whether it runs past 150 characters
+    parts = []
+    length = start = 0
+    while length <= 150:
+        tag = content.find("<", start)
+        end = content.find(">", tag + 1) if tag != -1 else -1
+        if end == -1:
+            parts.append(content[start : start + 151 - length])
+            break
+        parts.append(content[start : min(tag, start + 151 - length)])
+        length += len(parts[-1])
+        start = end + 1
+
     # Take first 150 characters
+    text = "".join(parts)
     return text[:150] + "..." if len(text) > 150 else text
 
 
+def tag_key(name: str) -> str:
+    """Fold a tag name the way MySQL's case- and accent-insensitive collation compares it ("Café" == "cafe")."""
+    return "".join(char for char in unicodedata.normalize("NFKD", name.casefold()) if not unicodedata.combining(char))
+
+
 async def get_or_create_tags(db: AsyncSession, tag_names: List[str]) -> List[Tag]:
     """Get existing tags or create new ones."""
-    tags = []
-    for tag_name in tag_names:
-        tag_name = tag_name.strip().lower()
-        if not tag_name:
-            continue
+    # Normalize and de-duplicate by the collation's notion of equality, keeping the given order
+    names = {}
+    for name in (tag_name.strip().lower() for tag_name in tag_names):
+        if name:
+            names.setdefault(tag_key(name), name)
+    if not names:
+        return []
+
+    result = await db.execute(select(Tag).where(Tag.name.in_(names.values())))
+    tags = {tag_key(tag.name): tag for tag in result.scalars()}
+
+    # Create the missing tags in one statement (ignoring any created concurrently), then load them
+    missing = [name for key, name in names.items() if key not in tags]
+    if missing:
+        await db.execute(INSERT_TAGS, [{"name": name} for name in missing])
+        result = await db.execute(select(Tag).where(Tag.name.in_(missing)))
+        tags.update((tag_key(tag.name), tag) for tag in result.scalars())
 
-        result = await db.execute(select(Tag).where(Tag.name == tag_name))
-        tag = result.scalar_one_or_none()
+    # Should the collation still match a name differently, skip that tag rather than fail the whole post
+    unmatched = [name for key, name in names.items() if key not in tags]
+    if unmatched:
+        logger.warning("Tags %s were not found after inserting them", unmatched)
 
-        if not tag:
-            tag = Tag(name=tag_name)
-            db.add(tag)
-            await db.flush()
+    return [tags[key] for key in names if key in tags]
 
-        tags.append(tag)
 
-    return tags
+def build_post_response(post: Post) -> PostResponse:
+    """Build the API response for a post loaded with its author and tags."""
+    return PostResponse.model_validate(post)
+
+
+async def get_post_response(db: AsyncSession, post_id: int) -> Optional[PostResponse]:
+    """Load a single post with its author and tags, or None if it does not exist."""
+    result = await db.execute(SELECT_POSTS.where(Post.id == post_id))
+    post = result.scalar_one_or_none()
+    return build_post_response(post) if post else None
+
+
+async def page_total(db: AsyncSession, rows: List[Row], page: int, count_query: Select) -> int:
+    """Read the window count off a page's rows, counting separately only for an empty page past the first."""
+    if rows:
+        return rows[0][-1]
+
+    return await db.scalar(count_query) if page > 1 else 0
+
+
+def encode_cursor(post: Post) -> str:
+    """Encode the feed position after a post as an opaque cursor."""
+    published_at = post.published_at.isoformat() if post.published_at else ""
+    return base64.urlsafe_b64encode(f"{published_at}|{post.id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode a feed cursor into the (published_at, id) of the last post seen."""
+    try:
+        published_at, post_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return (datetime.fromisoformat(published_at) if published_at else None), int(post_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def after_cursor(published_at: Optional[datetime], post_id: int):
+    """Filter for posts after the cursor in (published_at DESC, id DESC) order (NULL published_at sorts last)."""
+    if published_at is None:
+        return and_(Post.published_at.is_(None), Post.id < post_id)
+
+    return or_(
+        Post.published_at < published_at,
+        and_(Post.published_at == published_at, Post.id < post_id),
+        Post.published_at.is_(None),
+    )
 
 
 @router.post("", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
@@ -81,7 +178,7 @@ async def create_post(
         seo_description=post_data.seo_description,
         is_draft=post_data.is_draft,
         read_time=read_time,
-        author_id=current_user.id,
+        author=current_user,
         published_at=None if post_data.is_draft else datetime.utcnow(),
     )
 
@@ -89,90 +186,69 @@ async def create_post(
     await db.flush()
 
     # Handle tags
-    print(f"DEBUG: Received tags: {post_data.tags}")
-    if post_data.tags:
-        tags = await get_or_create_tags(db, post_data.tags)
-        print(f"DEBUG: Processed tags: {tags}")
-        for tag in tags:
-            print(f"DEBUG: Linking tag {tag.name} (id={tag.id}) to post {new_post.id}")
-            await db.execute(post_tags.insert().values(post_id=new_post.id, tag_id=tag.id))
+    logger.debug("Received tags: %s", post_data.tags)
+    tags = await get_or_create_tags(db, post_data.tags)
+    if tags:
+        logger.debug("Linking tags %s to post %s", tags, new_post.id)
+        await db.execute(post_tags.insert(), [{"post_id": new_post.id, "tag_id": tag.id} for tag in tags])
+    set_committed_value(new_post, "tags", tags)
 
     await db.commit()
-    await db.refresh(new_post)
-
-    # Load author and get counts
-    result = await db.execute(select(Post).options(selectinload(Post.author)).where(Post.id == new_post.id))
-    post = result.scalar_one()
 
-    # Get likes and comments count
-    likes_count = await db.scalar(select(func.count(Like.id)).where(Like.post_id == post.id))
-    comments_count = await db.scalar(select(func.count(Comment.id)).where(Comment.post_id == post.id))
-
-    # Get tags
-    tags_result = await db.execute(select(Tag).join(post_tags).where(post_tags.c.post_id == post.id))
-    tags = tags_result.scalars().all()
-
-    response = PostResponse.from_orm(post)
-    response.likes_count = likes_count or 0
-    response.comments_count = comments_count or 0
-    response.tags = [tag.name for tag in tags]
-
-    return response
+    # Everything needed is already in memory
+    return build_post_response(new_post)
 
 
 @router.get("", response_model=PostListResponse)
 async def get_posts(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(12, ge=1, le=100),
+    cursor: Optional[str] = None,
     is_draft: Optional[bool] = None,
     author_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get paginated list of blog posts (public feed)."""
-    # Base query - only published posts for public feed
-    query = select(Post).options(selectinload(Post.author))
+    """Get paginated list of blog posts (public feed).
 
+    Pass the previous response's next_cursor to seek straight to the next page instead of skipping rows by page.
+    """
     # Filter by draft status (default to published only)
-    if is_draft is None:
-        query = query.where(Post.is_draft == False)
-    else:
-        query = query.where(Post.is_draft == is_draft)
+    filters = [Post.is_draft == (False if is_draft is None else is_draft)]
 
     # Filter by author
     if author_id:
-        query = query.where(Post.author_id == author_id)
+        filters.append(Post.author_id == author_id)
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
-
-    # Apply pagination
-    query = query.order_by(Post.published_at.desc(), Post.created_at.desc())
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    # Posts with their tags for the page - one extra row tells whether there is a next page
+    if cursor:
+        # The cursor filter would narrow a window count, so the total is counted separately
+        total = await db.scalar(select(func.count(Post.id)).where(*filters))
+        query = SELECT_POSTS.where(*filters, after_cursor(*decode_cursor(cursor)))
+    else:
+        query = SELECT_POSTS_PAGE.where(*filters).offset((page - 1) * page_size)
 
-    # Execute query
+    query = query.order_by(Post.published_at.desc(), Post.id.desc()).limit(page_size + 1)
     result = await db.execute(query)
-    posts = result.scalars().all()
+    rows = result.all()
 
-    # Build response with counts
-    posts_response = []
-    for post in posts:
-        likes_count = await db.scalar(select(func.count(Like.id)).where(Like.post_id == post.id))
-        comments_count = await db.scalar(select(func.count(Comment.id)).where(Comment.post_id == post.id))
+    if not cursor:
+        total = await page_total(db, rows, page, select(func.count(Post.id)).where(*filters))
 
-        # Get tags
-        tags_result = await db.execute(select(Tag).join(post_tags).where(post_tags.c.post_id == post.id))
-        tags = tags_result.scalars().all()
-
-        post_resp = PostResponse.from_orm(post)
-        post_resp.likes_count = likes_count or 0
-        post_resp.comments_count = comments_count or 0
-        post_resp.tags = [tag.name for tag in tags]
-        posts_response.append(post_resp)
+    next_cursor = encode_cursor(rows[page_size - 1][0]) if len(rows) > page_size else None
+    posts_response = [build_post_response(row[0]) for row in rows[:page_size]]
 
     total_pages = (total + page_size - 1) // page_size if total else 0
 
-    return PostListResponse(posts=posts_response, total=total or 0, page=page, page_size=page_size, total_pages=total_pages)
+    posts_list = PostListResponse(
+        posts=posts_response,
+        total=total or 0,
+        page=page,
+        page_size=page_size,
+        total_pages=total_pages,
+        next_cursor=next_cursor,
+    )
+    return cached_json_response(request, posts_list, FEED_CACHE_CONTROL)
 
 
 @router.get("/my-posts", response_model=PostListResponse)
@@ -183,36 +259,14 @@ async def get_my_posts(
     db: AsyncSession = Depends(get_db),
 ):
     """Get current user's posts (including drafts)."""
-    # Query user's posts
-    query = select(Post).options(selectinload(Post.author)).where(Post.author_id == current_user.id)
-
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
-
-    # Apply pagination
-    query = query.order_by(Post.created_at.desc())
+    # User's posts with their counts, tags and the total count for the page
+    query = SELECT_POSTS_PAGE.where(Post.author_id == current_user.id).order_by(Post.created_at.desc())
     query = query.offset((page - 1) * page_size).limit(page_size)
 
-    # Execute query
     result = await db.execute(query)
-    posts = result.scalars().all()
-
-    # Build response
-    posts_response = []
-    for post in posts:
-        likes_count = await db.scalar(select(func.count(Like.id)).where(Like.post_id == post.id))
-        comments_count = await db.scalar(select(func.count(Comment.id)).where(Comment.post_id == post.id))
-
-        # Get tags
-        tags_result = await db.execute(select(Tag).join(post_tags).where(post_tags.c.post_id == post.id))
-        tags = tags_result.scalars().all()
-
-        post_resp = PostResponse.from_orm(post)
-        post_resp.likes_count = likes_count or 0
-        post_resp.comments_count = comments_count or 0
-        post_resp.tags = [tag.name for tag in tags]
-        posts_response.append(post_resp)
+    rows = result.all()
+    total = await page_total(db, rows, page, select(func.count(Post.id)).where(Post.author_id == current_user.id))
+    posts_response = [build_post_response(row[0]) for row in rows]
 
     total_pages = (total + page_size - 1) // page_size if total else 0
 
@@ -220,28 +274,14 @@ async def get_my_posts(
 
 
 @router.get("/{post_id}", response_model=PostResponse)
-async def get_post(post_id: int, db: AsyncSession = Depends(get_db)):
+async def get_post(post_id: int, request: Request, db: AsyncSession = Depends(get_db)):
     """Get a single blog post by ID."""
-    result = await db.execute(select(Post).options(selectinload(Post.author)).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
+    post_resp = await get_post_response(db, post_id)
 
-    if not post:
+    if not post_resp:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
 
-    # Get counts
-    likes_count = await db.scalar(select(func.count(Like.id)).where(Like.post_id == post.id))
-    comments_count = await db.scalar(select(func.count(Comment.id)).where(Comment.post_id == post.id))
-
-    # Get tags
-    tags_result = await db.execute(select(Tag).join(post_tags).where(post_tags.c.post_id == post.id))
-    tags = tags_result.scalars().all()
-
-    post_resp = PostResponse.from_orm(post)
-    post_resp.likes_count = likes_count or 0
-    post_resp.comments_count = comments_count or 0
-    post_resp.tags = [tag.name for tag in tags]
-
-    return post_resp
+    return cached_json_response(request, post_resp, POST_CACHE_CONTROL)
 
 
 @router.put("/{post_id}", response_model=PostResponse)
@@ -252,7 +292,8 @@ async def update_post(
     db: AsyncSession = Depends(get_db),
 ):
     """Update a blog post (owner only)."""
-    result = await db.execute(select(Post).where(Post.id == post_id))
+    # Load the post with its author and tags up front for the response
+    result = await db.execute(SELECT_POSTS.where(Post.id == post_id))
     post = result.scalar_one_or_none()
 
     if not post:
@@ -265,7 +306,8 @@ async def update_post(
     # Update fields
     if post_update.title is not None:
         post.title = post_update.title
-    if post_update.content is not None:
+    # The editor always sends the full content - only re-count words when it actually changed
+    if post_update.content is not None and post_update.content != post.content:
         post.content = post_update.content
         post.read_time = calculate_read_time(post_update.content)
     if post_update.excerpt is not None:
@@ -286,41 +328,25 @@ async def update_post(
 
     # Update tags if provided
     if post_update.tags is not None:
-        # Remove existing tags
-        await db.execute(post_tags.delete().where(post_tags.c.post_id == post.id))
-        # Add new tags
-        if post_update.tags:
-            tags = await get_or_create_tags(db, post_update.tags)
-            for tag in tags:
-                await db.execute(post_tags.insert().values(post_id=post.id, tag_id=tag.id))
+        tags = await get_or_create_tags(db, post_update.tags)
+        # Only touch the links that changed - the editor usually resends the same tags
+        current_ids = {tag.id for tag in post.tags}
+        new_ids = {tag.id for tag in tags}
+        if current_ids - new_ids:
+            await db.execute(DELETE_POST_TAGS, {"post_id": post.id, "tag_ids": list(current_ids - new_ids)})
+        if new_ids - current_ids:
+            await db.execute(post_tags.insert(), [{"post_id": post.id, "tag_id": tag_id} for tag_id in new_ids - current_ids])
+        set_committed_value(post, "tags", tags)
 
     await db.commit()
-    await db.refresh(post)
-
-    # Load author and get counts
-    result = await db.execute(select(Post).options(selectinload(Post.author)).where(Post.id == post.id))
-    post = result.scalar_one()
-
-    likes_count = await db.scalar(select(func.count(Like.id)).where(Like.post_id == post.id))
-    comments_count = await db.scalar(select(func.count(Comment.id)).where(Comment.post_id == post.id))
 
-    # Get tags
-    tags_result = await db.execute(select(Tag).join(post_tags).where(post_tags.c.post_id == post.id))
-    tags = tags_result.scalars().all()
-
-    post_resp = PostResponse.from_orm(post)
-    post_resp.likes_count = likes_count or 0
-    post_resp.comments_count = comments_count or 0
-    post_resp.tags = [tag.name for tag in tags]
-
-    return post_resp
+    return build_post_response(post)
 
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_post(post_id: int, current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
     """Delete a blog post (owner only)."""
-    result = await db.execute(select(Post).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
+    post = await db.get(Post, post_id)
 
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
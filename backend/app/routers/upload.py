@@ -1,46 +1,134 @@
+import logging
 import os
-import shutil
 import uuid
 from typing import List
 
+import aiofiles
+import aiofiles.os
 from fastapi import APIRouter, File, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
+from PIL import Image, ImageOps
 
 from app.config import settings
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = "uploads"
-ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+ALLOWED_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".webp", ".gif"})
+ALLOWED_CONTENT_TYPES = frozenset({"image/jpeg", "image/png", "image/webp", "image/gif"})
+ALLOWED_EXTENSIONS_TEXT = ", ".join(sorted(ALLOWED_EXTENSIONS))
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+THUMBNAIL_SIZE = (800, 800)
+WEBP_QUALITY = 82
+# Images are processed before the upload responds - favour encoding speed over the last few percent of size
+WEBP_METHOD = 4
+# GIFs are served as uploaded (usually animated)
+PROCESSED_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".webp"})
 
 if not os.path.exists(UPLOAD_DIR):
     os.makedirs(UPLOAD_DIR)
 
 
+def thumbnail_name(file_name: str) -> str:
+    """Name of the WebP thumbnail generated for an uploaded image."""
+    return f"{os.path.splitext(file_name)[0]}_thumb.webp"
+
+
+def process_image(file_path: str) -> bool:
+    """
+    Strip metadata from an uploaded image, re-encode it optimized and write a WebP thumbnail next to it.
+    Returns whether the thumbnail was written.
+    """
+    base, ext = os.path.splitext(file_path)
+    temp_path = f"{base}.tmp{ext}"
+    try:
+        with Image.open(file_path) as image:
+            # Animated images are served as uploaded - re-encoding would keep only the first frame
+            if getattr(image, "is_animated", False):
+                return False
+
+            # Keep the colour profile, so wide-gamut photos look the same once the other metadata is gone
+            icc_profile = image.info.get("icc_profile")
+
+            # Apply the EXIF orientation before the metadata (camera, GPS) is dropped
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+                # The profile describes the original colour space (e.g. CMYK), not the converted pixels
+                icc_profile = None
+
+            # Re-encode the full-size image without metadata, swapping it in atomically
+            if ext in (".jpg", ".jpeg"):
+                image.convert("RGB").save(
+                    temp_path, "JPEG", quality=85, optimize=True, progressive=True, icc_profile=icc_profile
+                )
+            elif ext == ".png":
+                image.save(temp_path, "PNG", optimize=True, icc_profile=icc_profile)
+            else:
+                image.save(temp_path, "WEBP", quality=WEBP_QUALITY, method=WEBP_METHOD, icc_profile=icc_profile)
+            os.replace(temp_path, file_path)
+
+            image.thumbnail(THUMBNAIL_SIZE)
+            image.save(thumbnail_name(file_path), "WEBP", quality=WEBP_QUALITY, method=WEBP_METHOD, icc_profile=icc_profile)
+            return True
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        # Not decodable (or too large) as an image - serve the upload as it is, without a thumbnail
+        logger.warning("Could not process uploaded image %s: %s", file_path, e)
+        if os.path.exists(thumbnail_name(file_path)):
+            os.remove(thumbnail_name(file_path))
+        return False
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
 @router.post("/upload", response_model=dict)
 async def upload_file(file: UploadFile = File(...)):
-    # Validate file extension
-    file_ext = os.path.splitext(file.filename)[1].lower()
-    if file_ext not in ALLOWED_EXTENSIONS:
+    # Validate file extension and the declared content type
+    file_name = file.filename or ""
+    dot = file_name.rfind(".")
+    file_ext = file_name[dot:].lower() if dot >= 0 else ""
+    if file_ext not in ALLOWED_EXTENSIONS or file.content_type not in ALLOWED_CONTENT_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}",
+            detail=f"File type not allowed. Allowed types: {ALLOWED_EXTENSIONS_TEXT}",
         )
 
     # Generate unique filename
     file_name = f"{uuid.uuid4()}{file_ext}"
     file_path = os.path.join(UPLOAD_DIR, file_name)
 
-    # Save file
+    # Save file in chunks without blocking the event loop, stopping once it exceeds the size limit
+    file_size = 0
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > MAX_FILE_SIZE:
+                    break
+                await buffer.write(chunk)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Could not save file: {str(e)}")
 
+    if file_size > MAX_FILE_SIZE:
+        await aiofiles.os.remove(file_path)
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB",
+        )
+
     # Construct full URL using configured STATIC_URL
     # This will be set to the domain in production (e.g., https://dev-blogapp.internal.rtg-homelabs.tech)
     url = f"{settings.STATIC_URL}/static/uploads/{file_name}"
 
-    return {"url": url, "filename": file_name}
+    # Process before responding: uploads are served as immutable, so the first fetch of a URL must
+    # already get the final, metadata-free file (run in the threadpool, as it is CPU-bound)
+    if file_ext not in PROCESSED_EXTENSIONS or not await run_in_threadpool(process_image, file_path):
+        return {"url": url, "filename": file_name, "thumbnail_url": None}
+
+    thumbnail_url = f"{settings.STATIC_URL}/static/uploads/{thumbnail_name(file_name)}"
+
+    return {"url": url, "filename": file_name, "thumbnail_url": thumbnail_url}
@@ -1,7 +1,10 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, List, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, field_validator
+
+# A tag name as given on a post; it must fit the tags.name column once trimmed
+TagName = Annotated[str, StringConstraints(strip_whitespace=True, max_length=50)]
 
 
 class TagBase(BaseModel):
@@ -22,7 +25,7 @@ class PostBase(BaseModel):
     seo_title: Optional[str] = Field(None, max_length=255)
     seo_description: Optional[str] = None
     is_draft: bool = True
-    tags: List[str] = []
+    tags: List[TagName] = []
 
 
 class PostCreate(PostBase):
@@ -37,7 +40,7 @@ class PostUpdate(BaseModel):
     seo_title: Optional[str] = Field(None, max_length=255)
     seo_description: Optional[str] = None
     is_draft: Optional[bool] = None
-    tags: Optional[List[str]] = None
+    tags: Optional[List[TagName]] = None
 
 
 class AuthorInfo(BaseModel):
@@ -61,6 +64,12 @@ class PostResponse(PostBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @field_validator("tags", mode="before")
+    @classmethod
+    def tag_names(cls, tags):
+        """Accept loaded Tag objects as well as plain names."""
+        return [tag if isinstance(tag, str) else tag.name for tag in tags]
+
 
 class PostListResponse(BaseModel):
     posts: List[PostResponse]
@@ -68,3 +77,4 @@ class PostListResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None
@@ -14,11 +14,18 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt."""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
     return hashed.decode("utf-8")
 
 
+def verify_and_hash_password(plain_password: str, hashed_password: str, new_password: str) -> Optional[str]:
+    """Verify a password and hash its replacement in one call; None if verification fails."""
+    if not verify_password(plain_password, hashed_password):
+        return None
+    return get_password_hash(new_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
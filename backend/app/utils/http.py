@@ -0,0 +1,25 @@
+import hashlib
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against an ETag, ignoring the W/ prefix nginx adds when it gzips a response."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+
+    return any(tag.strip().removeprefix("W/") in (etag, "*") for tag in if_none_match.split(","))
+
+
+def cached_json_response(request: Request, model: BaseModel, cache_control: str) -> Response:
+    """Serialize a response model once and tag it with an ETag of its body; a 304 if the client's copy is current."""
+    body = model.model_dump_json().encode()
+    etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(body, media_type="application/json", headers=headers)
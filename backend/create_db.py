@@ -2,12 +2,50 @@
 Script to create database tables.
 Run this after starting the MySQL database.
 """
+import argparse
 import asyncio
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.schema import CreateColumn
 from app.database import engine, Base
 from app.models import User, Post, Tag, Comment, Like, Bookmark  # Import all models
+from app.models.post import update_post_counters
 
 
-async def create_tables():
+def create_missing_indexes(connection):
+    """Create indexes added to models after their tables already existed."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def sync_post_counts(connection):
+    """Recount the denormalized likes/comments counters on posts (corrects any drift)."""
+    connection.execute(
+        update_post_counters(
+            likes_count=select(func.count(Like.id)).where(Like.post_id == Post.id).scalar_subquery(),
+            comments_count=select(func.count(Comment.id)).where(Comment.post_id == Post.id).scalar_subquery(),
+        )
+    )
+
+
+def add_missing_columns(connection):
+    """Add columns added to models after their tables already existed."""
+    inspector = inspect(connection)
+    added = set()
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_ddl = CreateColumn(column).compile(dialect=connection.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+                added.add(f"{table.name}.{column.name}")
+
+    # New post counters start at 0 - backfill them from the likes and comments tables once
+    if added & {"posts.likes_count", "posts.comments_count"}:
+        sync_post_counts(connection)
+
+
+async def create_tables(sync_counts: bool = False):
     """Create all database tables."""
     async with engine.begin() as conn:
         # Drop all tables (use with caution!)
@@ -15,9 +53,23 @@ async def create_tables():
         
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
+
+        # create_all skips existing tables, so add any new columns and indexes to them
+        await conn.run_sync(add_missing_columns)
+        await conn.run_sync(create_missing_indexes)
+
+        # A full-table recount races live likes and comments, so it only runs when asked for
+        if sync_counts:
+            await conn.run_sync(sync_post_counts)
     
     print("✅ Database tables created successfully!")
 
 
 if __name__ == "__main__":
-    asyncio.run(create_tables())
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sync-counts",
+        action="store_true",
+        help="recount the likes/comments counters on every post (a full-table update - run it off-peak)",
+    )
+    asyncio.run(create_tables(sync_counts=parser.parse_args().sync_counts))
@@ -1,8 +1,17 @@
+from uvicorn.workers import UvicornWorker
+
 from app.config import settings
 
+
+class UvloopWorker(UvicornWorker):
+    # Require uvloop + httptools instead of silently falling back to asyncio/h11
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
+
+
 bind = f"0.0.0.0:{settings.PORT}"
+# Each worker has its own DB pool: workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) must fit MySQL max_connections
 workers = 4
-worker_class = "uvicorn.workers.UvicornWorker"
+worker_class = UvloopWorker
 worker_connections = 1000
 max_requests = 1000
 max_requests_jitter = 50
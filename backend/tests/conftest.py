@@ -2,35 +2,40 @@
 Test configuration and fixtures for pytest.
 """
 
-import asyncio
-from typing import AsyncGenerator, Generator
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Dict
 
+import fakeredis
 import pytest
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.pool import StaticPool
 
-from app.database import Base, get_db
-from app.main import app
-
-# Test database URL (in-memory SQLite)
+# Test database URL (in-memory SQLite - private to each process, so each xdist worker has its own)
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
+# Point the app's own engine at in-memory SQLite too, so tests never reach a database from .env
+# (set before the app reads settings)
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+# Minimum bcrypt cost - hashing is on every register/login path
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
 
-@pytest.fixture(scope="session")
-def event_loop() -> Generator:
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+from app import cache  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from tests.utils import AuthedUser, UserFactory, create_test_user, expect_json  # noqa: E402
 
+SAMPLE_POST = {"title": "Shared Post", "content": "Shared content", "is_draft": False}
+FRESH_POST = {"title": "Fresh Post", "content": "Content", "is_draft": False}
 
-@pytest.fixture(scope="function")
-async def test_db() -> AsyncGenerator[AsyncSession, None]:
+
+@pytest.fixture(scope="session")
+async def test_engine() -> AsyncGenerator[AsyncEngine, None]:
     """
-    Create a fresh database for each test.
-    Uses in-memory SQLite for fast, isolated tests.
+    Create the test database once per session.
+    Uses in-memory SQLite for fast tests.
     """
     # Create async engine with in-memory SQLite
     engine = create_async_engine(
@@ -39,27 +44,66 @@ async def test_db() -> AsyncGenerator[AsyncSession, None]:
         poolclass=StaticPool,
     )
 
+    @event.listens_for(engine.sync_engine, "connect")
+    def configure_connection(dbapi_connection, connection_record):
+        # SQLite ignores foreign keys unless asked; MySQL (InnoDB) always enforces them
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+        # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work (the driver's implicit BEGIN breaks them)
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def begin_transaction(conn):
+        conn.exec_driver_sql("BEGIN")
+
     # Create tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-    # Create session
-    async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    yield engine
+
+    await engine.dispose()
 
-    async with async_session_maker() as session:
-        yield session
 
-    # Drop tables after test
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+@pytest.fixture(scope="function")
+async def test_db(test_engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Provide a session whose changes are rolled back after each test.
+    Commits in the app only release a SAVEPOINT inside the outer test transaction.
+    Configured like the app's AsyncSessionLocal, so tests see the same flush and expiry behaviour.
+    """
+    async with test_engine.connect() as conn:
+        transaction = await conn.begin()
+
+        async with AsyncSession(
+            bind=conn, expire_on_commit=False, autoflush=False, join_transaction_mode="create_savepoint"
+        ) as session:
+            yield session
+
+        await transaction.rollback()
 
-    await engine.dispose()
+
+@pytest.fixture(scope="session")
+async def http_client() -> AsyncGenerator[AsyncClient, None]:
+    """
+    Create one test client and ASGI transport for the whole session.
+    Every fixture reuses it, binding the database dependency as it needs.
+    ASGITransport sends no lifespan events, so the app's startup and shutdown run around the session here.
+    """
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test",
+            follow_redirects=False
+        ) as ac:
+            yield ac
 
 
 @pytest.fixture(scope="function")
-async def client(test_db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+async def client(http_client: AsyncClient, test_db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     """
-    Create a test client with overridden database dependency.
+    Provide the shared test client with the database dependency bound to this test's session.
     """
 
     async def override_get_db():
@@ -67,11 +111,104 @@ async def client(test_db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
 
     app.dependency_overrides[get_db] = override_get_db
 
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test",
-        follow_redirects=False
-    ) as ac:
-        yield ac
+    yield http_client
 
     app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+def make_user(client: AsyncClient, test_db: AsyncSession) -> UserFactory:
+    """
+    Factory for verified users created inside the test's transaction, each with a unique email.
+    """
+
+    async def _make_user(**kwargs) -> Dict:
+        return await create_test_user(client, db=test_db, **kwargs)
+
+    return _make_user
+
+
+@asynccontextmanager
+async def committed_client(http_client: AsyncClient, engine: AsyncEngine) -> AsyncIterator[AsyncClient]:
+    """
+    Provide the shared client with requests that commit, for data set up once and shared across tests.
+    Must be used outside a test's own client, as it swaps the database dependency.
+    """
+
+    async def committed_get_db():
+        async with AsyncSession(engine, expire_on_commit=False, autoflush=False) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = committed_get_db
+    try:
+        yield http_client
+    finally:
+        app.dependency_overrides.clear()
+
+
+async def create_committed_user(http_client: AsyncClient, engine: AsyncEngine, email: str) -> AuthedUser:
+    """
+    Register and verify a user that outlives each test's rollback.
+    Returns the user data and its authorization headers.
+    """
+    async with (
+        committed_client(http_client, engine) as ac,
+        AsyncSession(engine, expire_on_commit=False, autoflush=False) as session,
+    ):
+        user_data = await create_test_user(ac, email=email, db=session)
+
+    return user_data, user_data["headers"]
+
+
+@pytest.fixture(scope="session")
+async def authed_user(http_client: AsyncClient, test_engine: AsyncEngine) -> AuthedUser:
+    """
+    A verified user registered once for the whole session, with its auth headers.
+    Tests only roll back what they add, so the user itself is shared safely.
+    """
+    return await create_committed_user(http_client, test_engine, "shared@example.com")
+
+
+@pytest.fixture(scope="session")
+async def second_authed_user(http_client: AsyncClient, test_engine: AsyncEngine) -> AuthedUser:
+    """
+    Another shared verified user, for checks that one user cannot touch another's content.
+    """
+    return await create_committed_user(http_client, test_engine, "other@example.com")
+
+
+@pytest.fixture(scope="module")
+async def sample_post(
+    http_client: AsyncClient, test_engine: AsyncEngine, authed_user: AuthedUser
+) -> AsyncGenerator[Dict, None]:
+    """
+    A published post created once per module for read-only tests, deleted afterwards.
+    """
+    _, headers = authed_user
+    async with committed_client(http_client, test_engine) as ac:
+        post = expect_json(await ac.post("/api/posts", json=SAMPLE_POST, headers=headers), 201)
+
+    yield post
+
+    async with committed_client(http_client, test_engine) as ac:
+        await ac.delete(f"/api/posts/{post['id']}", headers=headers)
+
+
+@pytest.fixture(scope="function")
+async def fresh_post(client: AsyncClient, authed_user: AuthedUser) -> Dict:
+    """
+    A published post created inside the test's transaction, for tests that change or delete it.
+    """
+    _, headers = authed_user
+    return expect_json(await client.post("/api/posts", json=FRESH_POST, headers=headers), 201)
+
+
+@pytest.fixture(scope="function")
+def fake_redis(monkeypatch) -> fakeredis.FakeServer:
+    """
+    Point the cache helpers at an in-memory Redis for this test (caching is off otherwise).
+    Returns the server, so a test can disconnect it.
+    """
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(cache, "redis_client", fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+    return server
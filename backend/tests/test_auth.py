@@ -2,11 +2,11 @@
 Tests for authentication endpoints.
 """
 
-import pytest
 from httpx import AsyncClient
 
+from tests.utils import UserFactory, expect_json
+
 
-@pytest.mark.asyncio
 class TestAuthRegistration:
     """Test user registration flow."""
 
@@ -17,8 +17,7 @@ class TestAuthRegistration:
             json={"name": "John Doe", "email": "john@example.com", "password": "securepass123"},
         )
 
-        assert response.status_code == 201
-        data = response.json()
+        data = expect_json(response, 201)
         assert data["message"] == "User registered successfully. Please verify your email with OTP."
         assert data["email"] == "john@example.com"
         assert "otp_code" in data
@@ -42,7 +41,6 @@ class TestAuthRegistration:
         # Note: In production, you might want to customize this to return 400
 
 
-@pytest.mark.asyncio
 class TestAuthVerification:
     """Test OTP verification flow."""
 
@@ -61,8 +59,7 @@ class TestAuthVerification:
             json={"email": "test@example.com", "otp_code": otp_code},
         )
 
-        assert verify_response.status_code == 200
-        data = verify_response.json()
+        data = expect_json(verify_response)
         assert "access_token" in data
         assert data["token_type"] == "bearer"
         assert data["user"]["email"] == "test@example.com"
@@ -84,6 +81,23 @@ class TestAuthVerification:
         assert response.status_code == 400
         assert response.json()["detail"] == "Invalid OTP code"
 
+    async def test_verify_already_verified(self, client: AsyncClient):
+        """Test verifying an already verified user fails."""
+        register_response = await client.post(
+            "/api/auth/register",
+            json={"name": "Test User", "email": "test@example.com", "password": "testpass"},
+        )
+        otp_code = register_response.json()["otp_code"]
+        await client.post("/api/auth/verify", json={"email": "test@example.com", "otp_code": otp_code})
+
+        response = await client.post(
+            "/api/auth/verify",
+            json={"email": "test@example.com", "otp_code": otp_code},
+        )
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "User already verified"
+
     async def test_verify_nonexistent_user(self, client: AsyncClient):
         """Test verification for non-existent user fails."""
         response = await client.post(
@@ -95,53 +109,41 @@ class TestAuthVerification:
         assert response.json()["detail"] == "User not found"
 
 
-@pytest.mark.asyncio
 class TestAuthLogin:
     """Test user login flow."""
 
-    async def test_login_success(self, client: AsyncClient):
+    async def test_login_success(self, client: AsyncClient, make_user: UserFactory):
         """Test successful login with verified user."""
-        # Register and verify user
-        register_response = await client.post(
-            "/api/auth/register",
-            json={"name": "Test User", "email": "test@example.com", "password": "testpass123"},
-        )
-        otp_code = register_response.json()["otp_code"]
-
-        await client.post(
-            "/api/auth/verify",
-            json={"email": "test@example.com", "otp_code": otp_code},
-        )
+        user_data = await make_user()
 
         # Login
         response = await client.post(
             "/api/auth/login",
-            data={"username": "test@example.com", "password": "testpass123"},
+            data={"username": user_data["email"], "password": "testpass123"},
         )
 
-        assert response.status_code == 200
-        data = response.json()
+        data = expect_json(response)
         assert "access_token" in data
         assert data["token_type"] == "bearer"
 
-    async def test_login_wrong_password(self, client: AsyncClient):
+    async def test_login_wrong_password(self, client: AsyncClient, make_user: UserFactory):
         """Test login with wrong password fails."""
-        # Register and verify user
-        register_response = await client.post(
-            "/api/auth/register",
-            json={"name": "Test User", "email": "test@example.com", "password": "correctpass"},
-        )
-        otp_code = register_response.json()["otp_code"]
+        user_data = await make_user(password="correctpass")
 
-        await client.post(
-            "/api/auth/verify",
-            json={"email": "test@example.com", "otp_code": otp_code},
+        # Try to login with wrong password
+        response = await client.post(
+            "/api/auth/login",
+            data={"username": user_data["email"], "password": "wrongpass"},
         )
 
-        # Try to login with wrong password
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Incorrect email or password"
+
+    async def test_login_unknown_email(self, client: AsyncClient):
+        """Test login with an unregistered email fails like a wrong password."""
         response = await client.post(
             "/api/auth/login",
-            data={"username": "test@example.com", "password": "wrongpass"},
+            data={"username": "nobody@example.com", "password": "whatever123"},
         )
 
         assert response.status_code == 401
@@ -165,31 +167,18 @@ class TestAuthLogin:
         assert response.json()["detail"] == "Please verify your email first"
 
 
-@pytest.mark.asyncio
 class TestAuthProfile:
     """Test user profile endpoints."""
 
-    async def test_get_current_user(self, client: AsyncClient):
+    async def test_get_current_user(self, client: AsyncClient, make_user: UserFactory):
         """Test getting current user information."""
-        # Register and verify user
-        register_response = await client.post(
-            "/api/auth/register",
-            json={"name": "Test User", "email": "test@example.com", "password": "testpass"},
-        )
-        otp_code = register_response.json()["otp_code"]
-
-        verify_response = await client.post(
-            "/api/auth/verify",
-            json={"email": "test@example.com", "otp_code": otp_code},
-        )
-        token = verify_response.json()["access_token"]
+        user_data = await make_user()
 
         # Get current user
-        response = await client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+        response = await client.get("/api/auth/me", headers=user_data["headers"])
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["email"] == "test@example.com"
+        data = expect_json(response)
+        assert data["email"] == user_data["email"]
         assert data["name"] == "Test User"
 
     async def test_get_current_user_unauthorized(self, client: AsyncClient):
@@ -197,3 +186,44 @@ class TestAuthProfile:
         response = await client.get("/api/auth/me")
 
         assert response.status_code == 401
+
+
+class TestAuthPasswordChange:
+    """Test password change flow."""
+
+    async def test_change_password(self, client: AsyncClient, make_user: UserFactory):
+        """Test changing password and logging in with the new one."""
+        user_data = await make_user(password="oldpass123")
+        headers = user_data["headers"]
+
+        # Wrong current password
+        response = await client.post(
+            "/api/auth/change-password",
+            json={"current_password": "wrongpass", "new_password": "newpass123", "confirm_password": "newpass123"},
+            headers=headers,
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Current password is incorrect"
+
+        # Mismatched confirmation
+        response = await client.post(
+            "/api/auth/change-password",
+            json={"current_password": "oldpass123", "new_password": "newpass123", "confirm_password": "other12345"},
+            headers=headers,
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "New passwords do not match"
+
+        # Successful change
+        response = await client.post(
+            "/api/auth/change-password",
+            json={"current_password": "oldpass123", "new_password": "newpass123", "confirm_password": "newpass123"},
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+        response = await client.post(
+            "/api/auth/login",
+            data={"username": user_data["email"], "password": "newpass123"},
+        )
+        assert response.status_code == 200
@@ -0,0 +1,35 @@
+"""
+Tests for the Redis cache helpers.
+"""
+
+import fakeredis
+
+from app import cache
+from app.cache import cache_delete, cache_get_many, cache_set_many
+
+
+class TestCache:
+    """Test caching and invalidation."""
+
+    async def test_get_many(self, fake_redis: fakeredis.FakeServer):
+        """Test cached values come back decoded, with None for misses."""
+        await cache_set_many({"a": {"x": 1}, "b": [1, 2]}, expire=60)
+
+        assert await cache_get_many("a", "missing", "b") == [{"x": 1}, None, [1, 2]]
+        assert 0 < await cache.redis_client.ttl("a") <= 60
+
+    async def test_delete(self, fake_redis: fakeredis.FakeServer):
+        """Test invalidated keys read as misses."""
+        await cache_set_many({"a": 1, "b": 2}, expire=60)
+
+        await cache_delete("a", "b")
+
+        assert await cache_get_many("a", "b") == [None, None]
+
+    async def test_redis_unavailable(self, fake_redis: fakeredis.FakeServer):
+        """Test an unreachable Redis degrades to misses instead of failing the request."""
+        fake_redis.connected = False
+
+        await cache_set_many({"a": 1}, expire=60)
+        await cache_delete("a")
+        assert await cache_get_many("a") == [None]
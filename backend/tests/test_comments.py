@@ -0,0 +1,65 @@
+"""
+Tests for comments endpoints.
+"""
+
+from typing import Dict
+
+from httpx import AsyncClient
+
+from tests.utils import AuthedUser, expect_json
+
+
+class TestComments:
+    """Test comment creation, listing and deletion."""
+
+    async def test_create_and_list_comments(self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict):
+        """Test creating a comment and listing it with its author."""
+        _, headers = authed_user
+
+        post_id = fresh_post["id"]
+
+        response = await client.post("/api/comments", json={"post_id": post_id, "content": "Nice post"}, headers=headers)
+
+        data = expect_json(response, 201)
+        assert data["content"] == "Nice post"
+        assert data["author"]["name"] == "Test User"
+
+        response = await client.get(f"/api/comments/post/{post_id}")
+
+        comments = expect_json(response)
+        assert len(comments) == 1
+        assert comments[0]["author"]["id"] == data["author_id"]
+
+    async def test_comment_nonexistent_post(self, client: AsyncClient, authed_user: AuthedUser):
+        """Test commenting on a non-existent post returns 404."""
+        _, headers = authed_user
+
+        response = await client.post("/api/comments", json={"post_id": 99999, "content": "Hello"}, headers=headers)
+
+        assert response.status_code == 404
+
+    async def test_list_comments_nonexistent_post(self, client: AsyncClient):
+        """Test listing comments of a non-existent post returns 404."""
+        response = await client.get("/api/comments/post/99999")
+
+        assert response.status_code == 404
+
+    async def test_delete_own_comment(self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict):
+        """Test deleting own comment."""
+        _, headers = authed_user
+
+        post_id = fresh_post["id"]
+        comment_response = await client.post("/api/comments", json={"post_id": post_id, "content": "Bye"}, headers=headers)
+        comment_id = comment_response.json()["id"]
+
+        response = await client.get(f"/api/posts/{post_id}")
+        assert response.json()["comments_count"] == 1
+
+        response = await client.delete(f"/api/comments/{comment_id}", headers=headers)
+        assert response.status_code == 204
+
+        response = await client.get(f"/api/comments/post/{post_id}")
+        assert response.json() == []
+
+        response = await client.get(f"/api/posts/{post_id}")
+        assert response.json()["comments_count"] == 0
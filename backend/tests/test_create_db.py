@@ -0,0 +1,43 @@
+"""
+Tests for the database setup script.
+"""
+
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.like import Like
+from app.models.post import Post
+from create_db import add_missing_columns, sync_post_counts
+
+
+class TestSyncPostCounts:
+    """Test resyncing the post counters."""
+
+    async def test_sync_post_counts(self, test_db: AsyncSession, fresh_post: Dict):
+        """Test drifted counters are recounted without touching updated_at."""
+        edited_at = datetime(2020, 1, 1)
+        await test_db.execute(
+            update(Post).where(Post.id == fresh_post["id"]).values(likes_count=5, comments_count=3, updated_at=edited_at)
+        )
+
+        connection = await test_db.connection()
+        await connection.run_sync(sync_post_counts)
+
+        result = await test_db.execute(
+            select(Post.likes_count, Post.comments_count, Post.updated_at).where(Post.id == fresh_post["id"])
+        )
+        assert result.one() == (0, 0, edited_at)
+
+    async def test_counters_backfilled_when_added(self, test_db: AsyncSession, fresh_post: Dict):
+        """Test adding the counter columns to an existing posts table counts the existing likes into them."""
+        await test_db.execute(insert(Like).values(post_id=fresh_post["id"], user_id=fresh_post["author_id"]))
+        await test_db.execute(text("ALTER TABLE posts DROP COLUMN likes_count"))
+
+        connection = await test_db.connection()
+        await connection.run_sync(add_missing_columns)
+
+        likes_count = await test_db.scalar(select(Post.likes_count).where(Post.id == fresh_post["id"]))
+        assert likes_count == 1
@@ -0,0 +1,249 @@
+"""
+Tests for likes and bookmarks endpoints.
+"""
+
+import warnings
+from typing import Dict
+
+import fakeredis
+from httpx import AsyncClient
+from sqlalchemy import delete, event, false
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app import cache
+from app.cache import cache_get_many, cache_set_many
+from app.main import app
+from app.models.like import Bookmark, Like
+from app.routers import likes
+from tests.utils import AuthedUser, expect_json
+
+
+class TestLikes:
+    """Test like toggling."""
+
+    async def test_like_toggle(self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict):
+        """Test liking a post twice likes then unlikes it."""
+        _, headers = authed_user
+        post_id = fresh_post["id"]
+        updated_at = fresh_post["updated_at"]
+
+        response = await client.post(f"/api/posts/{post_id}/like", headers=headers)
+        assert expect_json(response) == {"is_liked": True, "likes_count": 1}
+
+        # The count is kept on the post row without marking the post as edited
+        data = (await client.get(f"/api/posts/{post_id}")).json()
+        assert data["likes_count"] == 1
+        assert data["updated_at"] == updated_at
+
+        response = await client.post(f"/api/posts/{post_id}/like", headers=headers)
+        assert expect_json(response) == {"is_liked": False, "likes_count": 0}
+
+    async def test_like_nonexistent_post(self, client: AsyncClient, authed_user: AuthedUser):
+        """Test liking a non-existent post returns 404."""
+        _, headers = authed_user
+
+        response = await client.post("/api/posts/99999/like", headers=headers)
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Post not found"
+
+    async def test_like_counts_before_insert(
+        self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict, test_engine: AsyncEngine
+    ):
+        """Test the post row is locked by its count UPDATE before the like is inserted, and a missing post inserts nothing."""
+        _, headers = authed_user
+        writes = []
+
+        def record_write(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith(("INSERT", "UPDATE", "DELETE")):
+                writes.append(statement.split()[0])
+
+        event.listen(test_engine.sync_engine, "before_cursor_execute", record_write)
+        try:
+            response = await client.post("/api/posts/99999/like", headers=headers)
+            assert response.status_code == 404
+            assert writes == ["DELETE", "UPDATE"]
+
+            writes.clear()
+            response = await client.post(f"/api/posts/{fresh_post['id']}/like", headers=headers)
+            assert expect_json(response) == {"is_liked": True, "likes_count": 1}
+            assert writes == ["DELETE", "UPDATE", "INSERT"]
+        finally:
+            event.remove(test_engine.sync_engine, "before_cursor_execute", record_write)
+
+    async def test_like_racing_duplicate(self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict, monkeypatch):
+        """Test a like racing another for the same user returns the liked state instead of a 404."""
+        _, headers = authed_user
+        post_id = fresh_post["id"]
+        await client.post(f"/api/posts/{post_id}/like", headers=headers)
+
+        # The racing request's unlike ran before the first like was committed, so it removed nothing
+        monkeypatch.setattr(likes, "DELETE_LIKE", delete(Like).where(false()))
+        response = await client.post(f"/api/posts/{post_id}/like", headers=headers)
+
+        assert expect_json(response) == {"is_liked": True, "likes_count": 1}
+
+    async def test_like_status_and_unlike(self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict):
+        """Test like status reflects likes and unlike removes them."""
+        _, headers = authed_user
+        post_id = fresh_post["id"]
+
+        response = await client.get(f"/api/posts/{post_id}/like-status", headers=headers)
+        assert expect_json(response) == {"is_liked": False, "likes_count": 0}
+
+        await client.post(f"/api/posts/{post_id}/like", headers=headers)
+        response = await client.get(f"/api/posts/{post_id}/like-status", headers=headers)
+        assert expect_json(response) == {"is_liked": True, "likes_count": 1}
+
+        response = await client.delete(f"/api/posts/{post_id}/like", headers=headers)
+        assert expect_json(response) == {"is_liked": False, "likes_count": 0}
+
+    async def test_like_status_cached(
+        self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict, fake_redis: fakeredis.FakeServer
+    ):
+        """Test like status is served from Redis until the user's own like or unlike clears it."""
+        user_data, headers = authed_user
+        post_id = fresh_post["id"]
+        like_key = f"like:{post_id}:{user_data['user']['id']}"
+
+        response = await client.get(f"/api/posts/{post_id}/like-status", headers=headers)
+        assert expect_json(response) == {"is_liked": False, "likes_count": 0}
+        assert await cache_get_many(like_key) == [{"is_liked": False, "likes_count": 0}]
+        assert 0 < await cache.redis_client.ttl(like_key) <= likes.STATUS_CACHE_TTL
+
+        # A cached status is answered without the database
+        await cache_set_many({like_key: {"is_liked": False, "likes_count": 7}}, expire=60)
+        response = await client.get(f"/api/posts/{post_id}/like-status", headers=headers)
+        assert expect_json(response) == {"is_liked": False, "likes_count": 7}
+
+        response = await client.post(f"/api/posts/{post_id}/like", headers=headers)
+        assert expect_json(response) == {"is_liked": True, "likes_count": 1}
+        assert await cache_get_many(like_key) == [None]
+
+        response = await client.get(f"/api/posts/{post_id}/like-status", headers=headers)
+        assert expect_json(response) == {"is_liked": True, "likes_count": 1}
+
+        response = await client.delete(f"/api/posts/{post_id}/like", headers=headers)
+        assert expect_json(response) == {"is_liked": False, "likes_count": 0}
+        assert await cache_get_many(like_key) == [None]
+
+    async def test_like_status_etag(self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict):
+        """Test like status answers 304 while the ETag still matches."""
+        _, headers = authed_user
+        post_id = fresh_post["id"]
+
+        response = await client.get(f"/api/posts/{post_id}/like-status", headers=headers)
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "private, max-age=5"
+
+        response = await client.get(f"/api/posts/{post_id}/like-status", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        # Liking changes the state, so the old ETag no longer matches
+        await client.post(f"/api/posts/{post_id}/like", headers=headers)
+        response = await client.get(f"/api/posts/{post_id}/like-status", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+        response = await client.head(f"/api/posts/{post_id}/like-status", headers=headers)
+        assert response.status_code == 200
+        assert response.content == b""
+
+    async def test_status_head_not_in_schema(self, client: AsyncClient):
+        """Test the HEAD status routes stay out of OpenAPI, so each operation ID is generated once."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            app.openapi_schema = None
+            schema = app.openapi()
+
+        for path in ("/api/posts/{post_id}/like-status", "/api/posts/{post_id}/bookmark-status"):
+            assert list(schema["paths"][path]) == ["get"]
+
+    async def test_like_status_nonexistent_post(self, client: AsyncClient, authed_user: AuthedUser):
+        """Test like status and unlike on a non-existent post return 404."""
+        _, headers = authed_user
+
+        response = await client.get("/api/posts/99999/like-status", headers=headers)
+        assert response.status_code == 404
+
+        response = await client.delete("/api/posts/99999/like", headers=headers)
+        assert response.status_code == 404
+
+
+class TestBookmarks:
+    """Test bookmark toggling."""
+
+    async def test_bookmark_toggle(self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict):
+        """Test bookmarking a post twice bookmarks then removes it."""
+        _, headers = authed_user
+        post_id = fresh_post["id"]
+
+        response = await client.post(f"/api/posts/{post_id}/bookmark", headers=headers)
+        assert expect_json(response) == {"is_bookmarked": True}
+
+        response = await client.post(f"/api/posts/{post_id}/bookmark", headers=headers)
+        assert expect_json(response) == {"is_bookmarked": False}
+
+    async def test_bookmark_nonexistent_post(self, client: AsyncClient, authed_user: AuthedUser):
+        """Test bookmarking a non-existent post returns 404."""
+        _, headers = authed_user
+
+        response = await client.post("/api/posts/99999/bookmark", headers=headers)
+
+        assert response.status_code == 404
+
+    async def test_bookmark_racing_duplicate(
+        self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict, monkeypatch
+    ):
+        """Test a bookmark racing another for the same user returns the bookmarked state instead of a 404."""
+        _, headers = authed_user
+        post_id = fresh_post["id"]
+        await client.post(f"/api/posts/{post_id}/bookmark", headers=headers)
+
+        monkeypatch.setattr(likes, "DELETE_BOOKMARK", delete(Bookmark).where(false()))
+        response = await client.post(f"/api/posts/{post_id}/bookmark", headers=headers)
+
+        assert expect_json(response) == {"is_bookmarked": True}
+
+    async def test_bookmark_status_cached(
+        self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict, fake_redis: fakeredis.FakeServer
+    ):
+        """Test bookmark status is served from Redis until the user's own bookmark or removal clears it."""
+        user_data, headers = authed_user
+        post_id = fresh_post["id"]
+        bookmark_key = f"bookmark:{post_id}:{user_data['user']['id']}"
+
+        response = await client.get(f"/api/posts/{post_id}/bookmark-status", headers=headers)
+        assert expect_json(response) == {"is_bookmarked": False}
+        assert await cache_get_many(bookmark_key) == [False]
+
+        response = await client.post(f"/api/posts/{post_id}/bookmark", headers=headers)
+        assert expect_json(response) == {"is_bookmarked": True}
+        assert await cache_get_many(bookmark_key) == [None]
+
+        response = await client.get(f"/api/posts/{post_id}/bookmark-status", headers=headers)
+        assert expect_json(response) == {"is_bookmarked": True}
+        assert await cache_get_many(bookmark_key) == [True]
+
+        response = await client.delete(f"/api/posts/{post_id}/bookmark", headers=headers)
+        assert expect_json(response) == {"is_bookmarked": False}
+        assert await cache_get_many(bookmark_key) == [None]
+
+    async def test_bookmark_status_and_remove(self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict):
+        """Test bookmark status reflects bookmarks and removal clears them."""
+        _, headers = authed_user
+        post_id = fresh_post["id"]
+
+        await client.post(f"/api/posts/{post_id}/bookmark", headers=headers)
+        response = await client.get(f"/api/posts/{post_id}/bookmark-status", headers=headers)
+        assert expect_json(response) == {"is_bookmarked": True}
+
+        response = await client.delete(f"/api/posts/{post_id}/bookmark", headers=headers)
+        assert expect_json(response) == {"is_bookmarked": False}
+
+        response = await client.get(f"/api/posts/{post_id}/bookmark-status", headers=headers)
+        assert expect_json(response) == {"is_bookmarked": False}
+
+        response = await client.delete("/api/posts/99999/bookmark", headers=headers)
+        assert response.status_code == 404
@@ -2,106 +2,171 @@
 Tests for posts endpoints.
 """
 
+from typing import Dict, Optional
+
 import pytest
 from httpx import AsyncClient
 
-from tests.utils import create_test_user, get_auth_headers
+from tests.utils import AuthedUser, expect_json
+
+# Request bodies shared by the tests below
+PUBLISHED_POST = {"title": "Test Post", "content": "This is a test post content", "is_draft": False}
+DRAFT_POST = {"title": "Original Title", "content": "Original content", "is_draft": True}
+POST_UPDATE = {"title": "Updated Title", "content": "Updated content", "is_draft": False}
 
 
-@pytest.mark.asyncio
 class TestPostCreation:
     """Test post creation."""
 
-    async def test_create_post_success(self, client: AsyncClient):
+    async def test_create_post_success(self, client: AsyncClient, authed_user: AuthedUser):
         """Test successful post creation."""
-        # Create and authenticate user
-        user_data = await create_test_user(client)
-        headers = await get_auth_headers(user_data["access_token"])
+        _, headers = authed_user
 
         # Create post
-        response = await client.post(
-            "/api/posts",
-            json={
-                "title": "Test Post",
-                "content": "This is a test post content",
-                "is_draft": False,
-            },
-            headers=headers,
-        )
+        response = await client.post("/api/posts", json=PUBLISHED_POST, headers=headers)
 
-        assert response.status_code == 201
-        data = response.json()
-        assert data["title"] == "Test Post"
-        assert data["content"] == "This is a test post content"
+        data = expect_json(response, 201)
+        assert data["title"] == PUBLISHED_POST["title"]
+        assert data["content"] == PUBLISHED_POST["content"]
         assert data["is_draft"] is False
         assert data["author"]["name"] == "Test User"
 
-    async def test_create_post_unauthorized(self, client: AsyncClient):
-        """Test post creation without authentication fails."""
+    async def test_create_post_excerpt(self, client: AsyncClient, authed_user: AuthedUser):
+        """Test the excerpt is the first 150 characters of the content without HTML tags."""
+        _, headers = authed_user
+
+        content = "<p>" + "<b>word</b> " * 100 + "</p>"
+        response = await client.post("/api/posts", json={"title": "Long Post", "content": content}, headers=headers)
+
+        assert response.status_code == 201
+        assert response.json()["excerpt"] == ("word " * 30) + "..."
+
+    async def test_create_post_tag_spellings(self, client: AsyncClient, authed_user: AuthedUser):
+        """Test tags differing only in case or accents become a single tag, as MySQL's collation compares them."""
+        _, headers = authed_user
+
         response = await client.post(
-            "/api/posts",
-            json={
-                "title": "Test Post",
-                "content": "Content",
-                "is_draft": False,
-            },
+            "/api/posts", json={"title": "Coffee", "content": "Content", "tags": ["Café", "cafe", "CAFÉ"]}, headers=headers
         )
 
-        assert response.status_code == 401
+        assert expect_json(response, 201)["tags"] == ["café"]
+
+    async def test_create_post_tag_too_long(self, client: AsyncClient, authed_user: AuthedUser):
+        """Test a tag longer than the column is rejected instead of being truncated."""
+        _, headers = authed_user
+
+        response = await client.post(
+            "/api/posts", json={"title": "Title", "content": "Content", "tags": ["x" * 51]}, headers=headers
+        )
+
+        assert response.status_code == 422
 
 
-@pytest.mark.asyncio
 class TestPostRetrieval:
     """Test post retrieval."""
 
-    async def test_get_all_posts(self, client: AsyncClient):
+    async def test_get_all_posts(self, client: AsyncClient, sample_post: Dict):
         """Test getting all published posts."""
-        # Create user and post
-        user_data = await create_test_user(client)
-        headers = await get_auth_headers(user_data["access_token"])
-
-        await client.post(
-            "/api/posts",
-            json={
-                "title": "Published Post",
-                "content": "Content",
-                "is_draft": False,
-            },
-            headers=headers,
-        )
-
-        # Get all posts
         response = await client.get("/api/posts")
 
-        assert response.status_code == 200
-        data = response.json()
+        data = expect_json(response)
         assert len(data["posts"]) >= 1
-        assert data["posts"][0]["title"] == "Published Post"
+        assert data["posts"][0]["id"] == sample_post["id"]
+        assert data["posts"][0]["title"] == "Shared Post"
 
-    async def test_get_post_by_id(self, client: AsyncClient):
+    async def test_get_post_by_id(self, client: AsyncClient, sample_post: Dict):
         """Test getting a specific post by ID."""
-        # Create user and post
-        user_data = await create_test_user(client)
-        headers = await get_auth_headers(user_data["access_token"])
+        response = await client.get(f"/api/posts/{sample_post['id']}")
+
+        data = expect_json(response)
+        assert data["id"] == sample_post["id"]
+        assert data["title"] == "Shared Post"
+
+    async def test_get_posts_with_counts_and_tags(self, client: AsyncClient, authed_user: AuthedUser):
+        """Test listed posts carry their tags, likes and comments counts."""
+        _, headers = authed_user
 
         create_response = await client.post(
             "/api/posts",
             json={
-                "title": "Test Post",
+                "title": "Tagged Post",
                 "content": "Content",
                 "is_draft": False,
+                "tags": ["Python", "fastapi", "python ", " "],
             },
             headers=headers,
         )
-        post_id = create_response.json()["id"]
+        created = expect_json(create_response, 201)
+        post_id = created["id"]
+        assert sorted(created["tags"]) == ["fastapi", "python"]
+
+        await client.post(f"/api/posts/{post_id}/like", headers=headers)
+        await client.post("/api/comments", json={"post_id": post_id, "content": "Nice"}, headers=headers)
+
+        response = await client.get("/api/posts")
+
+        post = expect_json(response)["posts"][0]
+        assert sorted(post["tags"]) == ["fastapi", "python"]
+        assert post["likes_count"] == 1
+        assert post["comments_count"] == 1
+
+    async def test_get_posts_cursor_pagination(self, client: AsyncClient, second_authed_user: AuthedUser):
+        """Test following next_cursor walks the feed without repeats."""
+        user_data, headers = second_authed_user
+        # Only this author's posts, so posts shared by other tests stay out of the pages
+        feed = {"author_id": user_data["user"]["id"], "page_size": 2}
+
+        for title in ("First", "Second", "Third"):
+            await client.post("/api/posts", json={"title": title, "content": "Content", "is_draft": False}, headers=headers)
+
+        response = await client.get("/api/posts", params=feed)
+        data = response.json()
+        assert [post["title"] for post in data["posts"]] == ["Third", "Second"]
+        assert data["next_cursor"]
+        assert data["total"] == 3
+        assert data["total_pages"] == 2
+
+        response = await client.get("/api/posts", params={**feed, "cursor": data["next_cursor"]})
+        data = response.json()
+        assert [post["title"] for post in data["posts"]] == ["First"]
+        assert data["next_cursor"] is None
+        assert data["total"] == 3
+
+        response = await client.get("/api/posts", params={**feed, "page": 5})
+        data = response.json()
+        assert data["posts"] == []
+        assert data["total"] == 3
+
+        response = await client.get("/api/posts", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+    async def test_get_post_etag(self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict):
+        """Test a post and the feed answer 304 while their ETags still match."""
+        _, headers = authed_user
+        post_id = fresh_post["id"]
 
-        # Get post by ID
         response = await client.get(f"/api/posts/{post_id}")
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "public, no-cache"
 
+        # nginx weakens the ETag when it gzips the body
+        response = await client.get(f"/api/posts/{post_id}", headers={"If-None-Match": f"W/{etag}"})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        response = await client.get("/api/posts")
+        feed_etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "public, max-age=30, stale-while-revalidate=120"
+        response = await client.get("/api/posts", headers={"If-None-Match": feed_etag})
+        assert response.status_code == 304
+
+        # A new comment changes the post's count, so the old ETags no longer match
+        await client.post("/api/comments", json={"post_id": post_id, "content": "Nice"}, headers=headers)
+        response = await client.get(f"/api/posts/{post_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["comments_count"] == 1
+        response = await client.get("/api/posts", headers={"If-None-Match": feed_etag})
         assert response.status_code == 200
-        data = response.json()
-        assert data["id"] == post_id
-        assert data["title"] == "Test Post"
 
     async def test_get_nonexistent_post(self, client: AsyncClient):
         """Test getting non-existent post returns 404."""
@@ -110,74 +175,60 @@ class TestPostRetrieval:
         assert response.status_code == 404
 
 
-@pytest.mark.asyncio
 class TestPostUpdate:
     """Test post updates."""
 
-    async def test_update_own_post(self, client: AsyncClient):
+    async def test_update_own_post(self, client: AsyncClient, authed_user: AuthedUser):
         """Test updating own post."""
-        # Create user and post
-        user_data = await create_test_user(client)
-        headers = await get_auth_headers(user_data["access_token"])
+        _, headers = authed_user
+
+        # Create post
+        create_response = await client.post("/api/posts", json=DRAFT_POST, headers=headers)
+        post_id = create_response.json()["id"]
+
+        # Update post
+        response = await client.put(f"/api/posts/{post_id}", json=POST_UPDATE, headers=headers)
+
+        data = expect_json(response)
+        assert data["title"] == POST_UPDATE["title"]
+        assert data["content"] == POST_UPDATE["content"]
+        assert data["is_draft"] is False
+
+    async def test_update_post_tags(self, client: AsyncClient, authed_user: AuthedUser):
+        """Test updating tags replaces them, reusing existing tags."""
+        _, headers = authed_user
 
         create_response = await client.post(
             "/api/posts",
-            json={
-                "title": "Original Title",
-                "content": "Original content",
-                "is_draft": True,
-            },
+            json={"title": "Title", "content": "Content", "tags": ["python", "sql"]},
             headers=headers,
         )
         post_id = create_response.json()["id"]
 
-        # Update post
-        response = await client.put(
-            f"/api/posts/{post_id}",
-            json={
-                "title": "Updated Title",
-                "content": "Updated content",
-                "is_draft": False,
-            },
-            headers=headers,
-        )
+        response = await client.put(f"/api/posts/{post_id}", json={"tags": ["sql", "redis"]}, headers=headers)
 
         assert response.status_code == 200
-        data = response.json()
-        assert data["title"] == "Updated Title"
-        assert data["content"] == "Updated content"
-        assert data["is_draft"] is False
+        assert sorted(response.json()["tags"]) == ["redis", "sql"]
 
-    async def test_update_post_unauthorized(self, client: AsyncClient):
-        """Test updating post without authentication fails."""
-        response = await client.put(
-            "/api/posts/1",
-            json={"title": "Updated", "content": "Content", "is_draft": False},
-        )
+        response = await client.get(f"/api/posts/{post_id}")
+        assert sorted(response.json()["tags"]) == ["redis", "sql"]
 
-        assert response.status_code == 401
+    async def test_update_other_users_post(self, client: AsyncClient, second_authed_user: AuthedUser, fresh_post: Dict):
+        """Test updating another user's post is forbidden."""
+        _, other_headers = second_authed_user
+
+        response = await client.put(f"/api/posts/{fresh_post['id']}", json={"title": "Theirs"}, headers=other_headers)
+
+        assert response.status_code == 403
 
 
-@pytest.mark.asyncio
 class TestPostDeletion:
     """Test post deletion."""
 
-    async def test_delete_own_post(self, client: AsyncClient):
+    async def test_delete_own_post(self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict):
         """Test deleting own post."""
-        # Create user and post
-        user_data = await create_test_user(client)
-        headers = await get_auth_headers(user_data["access_token"])
-
-        create_response = await client.post(
-            "/api/posts",
-            json={
-                "title": "Post to Delete",
-                "content": "Content",
-                "is_draft": False,
-            },
-            headers=headers,
-        )
-        post_id = create_response.json()["id"]
+        _, headers = authed_user
+        post_id = fresh_post["id"]
 
         # Delete post
         response = await client.delete(f"/api/posts/{post_id}", headers=headers)
@@ -188,8 +239,33 @@ class TestPostDeletion:
         get_response = await client.get(f"/api/posts/{post_id}")
         assert get_response.status_code == 404
 
-    async def test_delete_post_unauthorized(self, client: AsyncClient):
-        """Test deleting post without authentication fails."""
-        response = await client.delete("/api/posts/1")
+    async def test_delete_post_with_comments_and_likes(self, client: AsyncClient, authed_user: AuthedUser, fresh_post: Dict):
+        """Test deleting a post removes its comments and likes with it."""
+        _, headers = authed_user
+        post_id = fresh_post["id"]
+
+        await client.post("/api/comments", json={"post_id": post_id, "content": "First!"}, headers=headers)
+        await client.post(f"/api/posts/{post_id}/like", headers=headers)
+
+        response = await client.delete(f"/api/posts/{post_id}", headers=headers)
+
+        assert response.status_code == 204
+        assert (await client.get(f"/api/comments/post/{post_id}")).status_code == 404
+
+
+class TestPostAuthentication:
+    """Test post changes require authentication."""
+
+    @pytest.mark.parametrize(
+        "method, url, body",
+        [
+            ("POST", "/api/posts", PUBLISHED_POST),
+            ("PUT", "/api/posts/1", POST_UPDATE),
+            ("DELETE", "/api/posts/1", None),
+        ],
+    )
+    async def test_requires_authentication(self, client: AsyncClient, method: str, url: str, body: Optional[Dict]):
+        """Test creating, updating or deleting a post without authentication fails."""
+        response = await client.request(method, url, json=body)
 
         assert response.status_code == 401
@@ -0,0 +1,112 @@
+"""
+Tests for upload endpoints.
+"""
+
+import io
+
+import pytest
+from httpx import AsyncClient
+from PIL import Image, ImageCms
+
+from app.routers import upload
+from tests.utils import expect_json
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    """Save uploads to a temporary directory."""
+    monkeypatch.setattr(upload, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+class TestUpload:
+    """Test image uploads."""
+
+    async def test_upload_image(self, client: AsyncClient, upload_dir):
+        """Test uploading an image saves it under a generated name."""
+        response = await client.post("/api/upload", files={"file": ("photo.JPG", b"image-bytes", "image/jpeg")})
+
+        data = expect_json(response)
+        assert data["filename"].endswith(".jpg")
+        assert data["url"].endswith(f"/static/uploads/{data['filename']}")
+        # Bytes that do not decode as an image are kept as they are, without a thumbnail
+        assert data["thumbnail_url"] is None
+        assert [path.name for path in upload_dir.iterdir()] == [data["filename"]]
+        assert (upload_dir / data["filename"]).read_bytes() == b"image-bytes"
+
+    async def test_upload_disallowed_extension(self, client: AsyncClient, upload_dir):
+        """Test uploading a non-image file type fails."""
+        response = await client.post("/api/upload", files={"file": ("script.exe", b"binary", "image/jpeg")})
+
+        assert response.status_code == 400
+        assert list(upload_dir.iterdir()) == []
+
+    async def test_upload_disallowed_content_type(self, client: AsyncClient, upload_dir):
+        """Test uploading an image name with a non-image content type fails."""
+        response = await client.post("/api/upload", files={"file": ("photo.jpg", b"binary", "application/x-msdownload")})
+
+        assert response.status_code == 400
+        assert list(upload_dir.iterdir()) == []
+
+    async def test_upload_too_large(self, client: AsyncClient, upload_dir):
+        """Test uploading a file over the size limit fails and leaves nothing behind."""
+        content = b"x" * (upload.MAX_FILE_SIZE + 1)
+        response = await client.post("/api/upload", files={"file": ("photo.png", content, "image/png")})
+
+        assert response.status_code == 413
+        assert list(upload_dir.iterdir()) == []
+
+    async def test_upload_image_processed(self, client: AsyncClient, upload_dir):
+        """Test an uploaded image is re-encoded without metadata but its colour profile, and gets a WebP thumbnail."""
+        exif = Image.Exif()
+        exif[0x010F] = "Camera Maker"
+        icc_profile = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+        source = io.BytesIO()
+        Image.new("RGB", (1600, 1200), "red").save(source, "JPEG", exif=exif, icc_profile=icc_profile)
+
+        response = await client.post("/api/upload", files={"file": ("photo.jpg", source.getvalue(), "image/jpeg")})
+
+        data = expect_json(response)
+        assert data["thumbnail_url"].endswith(f"/static/uploads/{data['filename'][:-4]}_thumb.webp")
+        with Image.open(upload_dir / data["filename"]) as image:
+            assert image.size == (1600, 1200)
+            assert not image.getexif()
+            assert image.info["icc_profile"] == icc_profile
+        with Image.open(upload_dir / f"{data['filename'][:-4]}_thumb.webp") as thumbnail:
+            assert thumbnail.format == "WEBP"
+            assert thumbnail.size == (800, 600)
+            assert thumbnail.info["icc_profile"] == icc_profile
+
+    async def test_upload_gif_not_processed(self, client: AsyncClient, upload_dir):
+        """Test GIFs are kept as uploaded, without a thumbnail."""
+        response = await client.post("/api/upload", files={"file": ("anim.gif", b"gif-bytes", "image/gif")})
+
+        data = expect_json(response)
+        assert data["thumbnail_url"] is None
+        assert [path.name for path in upload_dir.iterdir()] == [data["filename"]]
+
+    async def test_upload_animated_webp_not_processed(self, client: AsyncClient, upload_dir):
+        """Test animated images keep all their frames, without a thumbnail."""
+        frames = [Image.new("RGB", (64, 64), color) for color in ("red", "green", "blue")]
+        source = io.BytesIO()
+        frames[0].save(source, "WEBP", save_all=True, append_images=frames[1:])
+
+        response = await client.post("/api/upload", files={"file": ("anim.webp", source.getvalue(), "image/webp")})
+
+        data = expect_json(response)
+        assert data["thumbnail_url"] is None
+        assert (upload_dir / data["filename"]).read_bytes() == source.getvalue()
+        with Image.open(upload_dir / data["filename"]) as image:
+            assert image.n_frames == 3
+
+    async def test_upload_decompression_bomb(self, client: AsyncClient, upload_dir, monkeypatch):
+        """Test an image over Pillow's pixel limit is kept as uploaded, leaving no temporary files."""
+        monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+        source = io.BytesIO()
+        Image.new("RGB", (100, 100), "red").save(source, "PNG")
+
+        response = await client.post("/api/upload", files={"file": ("big.png", source.getvalue(), "image/png")})
+
+        data = expect_json(response)
+        assert data["thumbnail_url"] is None
+        assert [path.name for path in upload_dir.iterdir()] == [data["filename"]]
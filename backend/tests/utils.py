@@ -2,42 +2,68 @@
 Utility functions for tests.
 """
 
-from typing import Dict
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 
-from httpx import AsyncClient
+from httpx import AsyncClient, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.user import User
+from app.schemas.user import UserResponse
+from app.utils.auth import create_access_token
 
-async def create_test_user(client: AsyncClient, email: str = "test@example.com", password: str = "testpass123") -> Dict:
+# User data and authorization headers of a registered, verified user
+AuthedUser = Tuple[Dict, Dict[str, str]]
+# The make_user fixture: creates a verified user per call, taking create_test_user's keyword arguments
+UserFactory = Callable[..., Awaitable[Dict]]
+
+
+def expect_json(response: Response, status_code: int = 200) -> Any:
+    """
+    Assert a response's status (showing the body on failure) and decode its JSON once.
+    """
+    assert response.status_code == status_code, response.text
+    return response.json()
+
+
+async def create_test_user(
+    client: AsyncClient, email: Optional[str] = None, password: str = "testpass123", db: Optional[AsyncSession] = None
+) -> Dict:
     """
-    Helper function to create and verify a test user.
-    Returns the user data with access token.
+    Helper function to create and verify a test user (with a unique email unless one is given).
+    Given a database session, the user is verified directly and issued a token, skipping the OTP round trip.
+    Returns the user data with access token and authorization headers.
     """
+    email = email or f"user-{uuid.uuid4().hex[:12]}@example.com"
+
     # Register user
     register_response = await client.post(
         "/api/auth/register",
         json={"name": "Test User", "email": email, "password": password},
     )
-    assert register_response.status_code == 201
-    register_data = register_response.json()
+    register_data = expect_json(register_response, 201)
 
-    # Verify OTP
-    verify_response = await client.post(
-        "/api/auth/verify",
-        json={"email": email, "otp_code": register_data["otp_code"]},
-    )
-    assert verify_response.status_code == 200
-    verify_data = verify_response.json()
+    if db is None:
+        # Verify OTP
+        verify_response = await client.post(
+            "/api/auth/verify",
+            json={"email": email, "otp_code": register_data["otp_code"]},
+        )
+        verify_data = expect_json(verify_response)
+        access_token, user = verify_data["access_token"], verify_data["user"]
+    else:
+        # Mark verified as the OTP endpoint would, and sign the token ourselves
+        await db.execute(update(User).where(User.email == email).values(is_verified=1, otp_code=None, otp_created_at=None))
+        await db.commit()
+        db_user = await db.scalar(select(User).where(User.email == email))
+        access_token = create_access_token(data={"sub": str(db_user.id)})
+        user = UserResponse.model_validate(db_user).model_dump(mode="json")
 
     return {
         "email": email,
         "password": password,
-        "access_token": verify_data["access_token"],
-        "user": verify_data["user"],
+        "access_token": access_token,
+        "user": user,
+        "headers": {"Authorization": f"Bearer {access_token}"},
     }
-
-
-async def get_auth_headers(token: str) -> Dict[str, str]:
-    """
-    Helper function to create authorization headers.
-    """
-    return {"Authorization": f"Bearer {token}"}
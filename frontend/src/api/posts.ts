@@ -32,6 +32,7 @@ export interface PostListResponse {
     page: number;
     page_size: number;
     total_pages: number;
+    next_cursor: string | null;
 }
 
 export interface CreatePostData {
@@ -56,10 +57,10 @@ export interface UpdatePostData {
     tags?: string[];
 }
 
-// Get public posts (paginated)
-export const getPosts = async (page: number = 1, page_size: number = 12): Promise<PostListResponse> => {
+// Get public posts (paginated - pass the previous page's next_cursor to seek to the next one)
+export const getPosts = async (page: number = 1, page_size: number = 12, cursor?: string): Promise<PostListResponse> => {
     const response = await apiClient.get('/posts', {
-        params: { page, page_size },
+        params: { page, page_size, cursor },
     });
     return response.data;
 };
@@ -3,6 +3,7 @@ import apiClient from './client';
 export interface UploadResponse {
     url: string;
     filename: string;
+    thumbnail_url: string | null;
 }
 
 export const uploadFile = async (file: File): Promise<UploadResponse> => {
@@ -20,6 +21,10 @@ export const uploadFile = async (file: File): Promise<UploadResponse> => {
     if (url.startsWith('/') && import.meta.env.VITE_API_URL) {
         response.data.url = `${import.meta.env.VITE_API_URL}${url}`;
     }
+    const thumbnailUrl = response.data.thumbnail_url;
+    if (thumbnailUrl?.startsWith('/') && import.meta.env.VITE_API_URL) {
+        response.data.thumbnail_url = `${import.meta.env.VITE_API_URL}${thumbnailUrl}`;
+    }
 
     return response.data;
 };
@@ -20,13 +20,15 @@ export default function Feed() {
   const observerRef = useRef<IntersectionObserver | null>(null);
   const loadMoreRef = useRef<HTMLDivElement>(null);
   const isFetchingRef = useRef(false);
+  const cursorRef = useRef<string | null>(null);
 
   const fetchPosts = useCallback(async (pageNum: number) => {
     if (isFetchingRef.current) return;
     isFetchingRef.current = true;
 
     try {
-      const response = await getPosts(pageNum, ITEMS_PER_PAGE);
+      const cursor = pageNum === 1 ? undefined : cursorRef.current ?? undefined;
+      const response = await getPosts(pageNum, ITEMS_PER_PAGE, cursor);
 
       if (pageNum === 1) {
         setPosts(response.posts);
@@ -40,7 +42,8 @@ export default function Feed() {
         });
       }
 
-      setHasMore(pageNum < response.total_pages);
+      cursorRef.current = response.next_cursor;
+      setHasMore(response.next_cursor !== null);
     } catch (error) {
       console.error('Failed to fetch posts:', error);
     } finally {